@@ -0,0 +1,99 @@
+"""
+Compare the vectorized backside correction in lumflows.utils against the original
+per-wavelength loop implementation.
+
+Usage:
+    python benchmarks/bench_backside.py [number_of_points ...]
+"""
+
+import sys
+import timeit
+from math import pi, sin, radians, exp
+from cmath import sqrt
+
+import numpy as np
+
+from lumflows.utils import (zeros_like, _compute_R_backside, _compute_T_backside,
+                            compute_substrate_spectra, compute_absoprtion_term,
+                            compute_R_with_backside, compute_T_with_backside)
+
+
+######################################################################
+#                                                                    #
+# Reference loop implementation                                      #
+#                                                                    #
+######################################################################
+def loop_substrate_spectra(wvls, N_substrate):
+    R_back = zeros_like(wvls)
+    T_back = zeros_like(R_back)
+
+    for i in range(len(wvls)):
+        R_back[i] = _compute_R_backside(N_substrate[i])
+        T_back[i] = _compute_T_backside(R_back[i])
+
+    return R_back, T_back
+
+def loop_beta(wvls, N, theta = 0.0, thickness = 2000000.0):
+    beta_i = zeros_like(wvls)
+    sin_theta = sin(radians(theta))
+
+    for i in range(len(wvls)):
+        n_sin_theta = N[i] * sin_theta
+        N_s_s = sqrt(N[i] * N[i] - n_sin_theta * n_sin_theta)
+        if N_s_s.real == 0.0:
+            N_s_s = -N_s_s
+        beta_i[i] = np.imag(2 * pi * thickness * N_s_s / wvls[i])
+
+    return beta_i
+
+def loop_R_T(wvls, R_f, T_f, R_r, T_r, R_back, T_back, beta):
+    R = zeros_like(wvls)
+    T = zeros_like(wvls)
+
+    for i in range(len(wvls)):
+        loss = 1.0 - R_r[i] * R_back[i] * exp(4.0*beta[i])
+        R[i] = R_f[i] + T_f[i] * T_r[i] * R_back[i] * exp(4.0*beta[i]) / loss
+        T[i] = T_f[i] * T_back[i] * exp(2.0*beta[i]) / loss
+
+    return R, T
+
+
+def loop_pipeline(wvls, N, R_f, T_f, R_r, T_r):
+    R_back, T_back = loop_substrate_spectra(wvls, N)
+    beta = loop_beta(wvls, N)
+    return loop_R_T(wvls, R_f, T_f, R_r, T_r, R_back, T_back, beta)
+
+def vectorized_pipeline(wvls, N, R_f, T_f, R_r, T_r):
+    R_back, T_back = compute_substrate_spectra(wvls, N)
+    beta = compute_absoprtion_term(wvls, N)
+    R = compute_R_with_backside(wvls, R_f, T_f, R_r, T_r, R_back, beta)
+    T = compute_T_with_backside(wvls, T_f, R_r, T_back, R_back, beta)
+    return R, T
+
+
+def make_inputs(number_of_points, seed = 0):
+    rng = np.random.default_rng(seed)
+    wvls = np.linspace(210.0, 2500.0, number_of_points)
+    N = 1.52 + 0.01 * rng.random(number_of_points) - 1e-7j * rng.random(number_of_points)
+    R_f, R_r = 0.3 * rng.random((2, number_of_points))
+    T_f, T_r = 1.0 - R_f, 1.0 - R_r
+    return wvls, N, R_f, T_f, R_r, T_r
+
+
+def main(sizes):
+    print(f"{'points':>10} {'loop [ms]':>12} {'vectorized [ms]':>16} {'speedup':>9} {'max |diff|':>12}")
+    for number_of_points in sizes:
+        inputs = make_inputs(number_of_points)
+        ref = loop_pipeline(*inputs)
+        new = vectorized_pipeline(*inputs)
+        diff = max(np.max(np.abs(a - b)) for a, b in zip(ref, new))
+
+        repeat = max(1, 20000 // number_of_points)
+        t_loop = timeit.timeit(lambda: loop_pipeline(*inputs), number=repeat) / repeat
+        t_vect = timeit.timeit(lambda: vectorized_pipeline(*inputs), number=repeat) / repeat
+
+        print(f"{number_of_points:>10} {t_loop*1e3:>12.3f} {t_vect*1e3:>16.3f} {t_loop/t_vect:>9.1f} {diff:>12.3e}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [701, 10000, 100000])
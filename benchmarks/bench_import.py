@@ -0,0 +1,46 @@
+"""
+Measure the import time of lumflows modules and check that importing the spectral math
+does not pull in plotting, HDF5 or the Lumerical API.
+
+Usage:
+    python benchmarks/bench_import.py [module ...]
+
+Exits with a non-zero status if a heavy dependency is imported.
+"""
+
+import subprocess
+import sys
+
+# Modules that must not be imported by the light-weight entry points
+HEAVY_MODULES = ("matplotlib", "lumapi", "h5py")
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(repr((elapsed, heavy)))
+"""
+
+
+def measure(module):
+    """ Import `module` in a fresh interpreter and return (seconds, heavy modules imported). """
+    output = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                            check=True, capture_output=True, text=True).stdout
+    return eval(output.strip().splitlines()[-1])
+
+
+def main(modules):
+    failed = False
+    print(f"{'module':<28} {'time [ms]':>10}  heavy imports")
+    for module in modules:
+        elapsed, heavy = measure(module)
+        failed = failed or bool(heavy)
+        print(f"{module:<28} {elapsed*1e3:>10.1f}  {', '.join(heavy) or '-'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:] or ["numpy", "lumflows", "lumflows.spectral_tools", "lumflows.io", "lumflows.parsers"]))
@@ -0,0 +1,81 @@
+"""
+Generate a large Lumerical-style RTA text export and compare the streaming parser in
+lumflows.parsers against the original line-by-line implementation.
+
+Usage:
+    python benchmarks/bench_rta_parser.py [number_of_points] [output_file]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+from lumflows.parsers import single_rta
+
+
+def write_rta_file(filename, number_of_points, seed = 0):
+    """ Write an RTA export with R, T and A sections of `number_of_points` rows each. """
+    rng = np.random.default_rng(seed)
+    wvls = np.linspace(210e-9, 2500e-9, number_of_points)
+    R = 0.3 * rng.random(number_of_points)
+    T = (1.0 - R) * rng.random(number_of_points)
+
+    with open(filename, "w") as f:
+        for label, data in (("R", R), ("T", T), ("A", 1.0 - R - T)):
+            f.write(f"wavelength (m), {label}\n")
+            np.savetxt(f, np.column_stack((wvls, data)), fmt="%.10e", delimiter=", ")
+            f.write("\n")
+
+
+def reference_single_rta(file):
+    """ The original per-line parser. """
+    wavelength_R, data_R = [], []
+    wavelength_T, data_T = [], []
+    wavelength_A, data_A = [], []
+    current_data = None
+
+    with open(file, "r") as file:
+        for line in file:
+            if line.strip() == "":
+                current_data = None
+                continue
+            if "wavelength" in line:
+                if "R" in line:
+                    current_data = (wavelength_R, data_R)
+                elif "T" in line:
+                    current_data = (wavelength_T, data_T)
+                elif "A" in line:
+                    current_data = (wavelength_A, data_A)
+                continue
+            if current_data is not None:
+                values = line.strip().split(",")
+                current_data[0].append(float(values[0]))
+                current_data[1].append(float(values[1]))
+
+    return (np.array([wavelength_R, data_R]), np.array([wavelength_T, data_T]),
+            np.array([wavelength_A, data_A]))
+
+
+def main(number_of_points = 1000000, filename = "bench_rta.txt"):
+    write_rta_file(filename, number_of_points)
+    print(f"File size: {os.path.getsize(filename) / 2**20:.1f} MiB")
+
+    try:
+        start = time.perf_counter()
+        ref = reference_single_rta(filename)
+        t_ref = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new = single_rta(filename)
+        t_new = time.perf_counter() - start
+    finally:
+        os.remove(filename)
+
+    diff = max(np.max(np.abs(a - b)) for a, b in zip(ref, new))
+    print(f"line-by-line: {t_ref:.3f} s, streaming: {t_new:.3f} s, speedup: {t_ref / t_new:.1f}, max |diff|: {diff:.3e}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) if i == 0 else arg for i, arg in enumerate(sys.argv[1:])))
@@ -1,6 +1,62 @@
-from .api import FDTD
 from .definitions import *
-from .diagnostics import *
-from .spectral_tools import *
-from .io import *
-from .parsers import *
\ No newline at end of file
+
+# Everything else is imported on first access (PEP 562), so that e.g. headless workers
+# importing lumflows.spectral_tools do not pay for matplotlib or the Lumerical API.
+
+# Names re-exported from the submodules
+_LAZY_ATTRIBUTES = {
+    "FDTD": "api",
+    "display_spectra": "diagnostics",
+    "SweepRunner": "sweep",
+    "parameter_grid": "sweep",
+    "ResultCache": "cache",
+    "incoherent_stack": "multilayer",
+    "fresnel_interface": "multilayer",
+    "SpectraStore": "store",
+    "SweepDataset": "dataset",
+    "SweepJournal": "journal",
+    "AsyncFDTD": "aio",
+    "Recorder": "instrument",
+}
+
+# Submodules whose public names are all re-exported
+_LAZY_STAR_MODULES = ("spectral_tools", "io", "parsers")
+
+def _import(module):
+    import importlib
+    return importlib.import_module("." + module, __name__)
+
+def _public_names(module):
+    return [name for name in vars(module) if not name.startswith("_")]
+
+def __getattr__(name):
+    if name == "__all__":
+        # A star import of the package imports everything
+        names = set(_public_names(_import("definitions"))) | set(_LAZY_ATTRIBUTES)
+        for module in _LAZY_STAR_MODULES:
+            names.update(_public_names(_import(module)))
+        value = sorted(names)
+    elif name in _LAZY_ATTRIBUTES:
+        value = getattr(_import(_LAZY_ATTRIBUTES[name]), name)
+    elif not name.startswith("_"):
+        for module in _LAZY_STAR_MODULES:
+            module = _import(module)
+            if hasattr(module, name):
+                value = getattr(module, name)
+                break
+        else:
+            # Submodules, e.g. lumflows.tmm
+            try:
+                value = _import(name)
+            except ModuleNotFoundError as e:
+                if e.name != f"{__name__}.{name}":
+                    raise
+                raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -0,0 +1,140 @@
+# This module drives FDTD sessions, e.g. on remote Interop Servers, from an asyncio event loop
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from .api import FDTD
+
+def _close_late_session(future):
+    # The session arrived after open() gave up on it, nobody else can close it
+    if future.cancelled() or future.exception() is not None:
+        return
+    try:
+        future.result().close()
+    except Exception:
+        pass
+
+class AsyncFDTD():
+    def __init__(self, fdtd, executor, timeout = None):
+        # Use AsyncFDTD.open() instead
+        self.fdtd = fdtd
+        self.timeout = timeout
+        self._executor = executor
+
+    @classmethod
+    async def open(cls, *args, timeout = None, session_factory = None, **kwargs):
+        """
+        Launches a new session without blocking the event loop.
+
+        Parameters:
+        -----------
+        *args, **kwargs :
+            The arguments of FDTD(), e.g. remoteArgs={"hostname": ..., "port": 8989}.
+
+        timeout : float, optional
+            The default timeout (seconds) of every call of the session; None waits indefinitely.
+
+        session_factory : callable, optional
+            Creates the session instead of FDTD(*args, **kwargs), e.g. a local stand-in for
+            an Interop Server in tests.
+
+        Returns:
+        --------
+        AsyncFDTD
+            The session. All its lumapi calls run one after another in a dedicated thread,
+            so a session is never used by two threads at once.
+
+        Notes:
+        ------
+        - If the launch times out or is cancelled, a session that is still being created is
+          closed as soon as it arrives.
+
+        Example:
+            async def sweep(hosts, points):
+                sessions = await asyncio.gather(*(AsyncFDTD.open(hide=True, remoteArgs={"hostname": host, "port": 8989})
+                                                  for host in hosts))
+                ...
+                await asyncio.gather(*(session.run() for session in sessions))
+        """
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lumflows-session")
+        factory = functools.partial(FDTD, *args, **kwargs) if session_factory is None else session_factory
+
+        future = executor.submit(factory)
+        try:
+            fdtd = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except BaseException:
+            future.add_done_callback(_close_late_session)
+            executor.shutdown(wait=False)
+            raise
+
+        return cls(fdtd, executor, timeout=timeout)
+
+    async def call(self, method, *args, timeout = None, **kwargs):
+        """
+        Calls a method of the wrapped FDTD session in the session thread.
+
+        Parameters:
+        -----------
+        method : str
+            The name of the method, e.g. "run_simulation" or any lumapi command.
+
+        timeout : float, optional
+            Overrides the default timeout of the session for this call.
+
+        Notes:
+        ------
+        - On timeout or cancellation the awaiting coroutine stops immediately, but a lumapi call
+          that has already started cannot be interrupted: it finishes in the session thread and
+          later calls of the session wait for it. Calls that have not started yet are dropped.
+          Close a session that timed out rather than reuse it, as its model state is unknown.
+        """
+        if self._executor is None:
+            raise RuntimeError("The session is closed.")
+
+        future = self._executor.submit(functools.partial(getattr(self.fdtd, method), *args, **kwargs))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout if timeout is None else timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            future.cancel()
+            raise
+
+    def __getattr__(self, method):
+        # Any other method of FDTD becomes awaitable, e.g. await session.set_source_polarization("source", 90)
+        if method.startswith("_") or "fdtd" not in self.__dict__:
+            raise AttributeError(method)
+
+        return functools.partial(self.call, method)
+
+    async def run(self, timeout = None):
+        """ Runs the simulation. """
+        return await self.call("run_simulation", timeout=timeout)
+
+    async def getdata(self, monitor_name, data, timeout = None):
+        """ Returns the data of a monitor, see FDTD.get_data(). """
+        return await self.call("get_data", monitor_name, data, timeout=timeout)
+
+    async def setnamed(self, object_name, prop, value, timeout = None):
+        """ Sets a property of an object. """
+        return await self.call("_setnamed", object_name, prop, value, timeout=timeout)
+
+    async def configure(self, object_name, properties, timeout = None):
+        """ Sets several properties of an object in a single round-trip, see FDTD.configure(). """
+        return await self.call("configure", object_name, properties, timeout=timeout)
+
+    async def close(self):
+        """ Closes the session and stops its thread, waiting for a running call to finish first. """
+        if self._executor is None:
+            return
+
+        try:
+            # Not bound by the default timeout: the session must be closed in any case
+            await asyncio.wrap_future(self._executor.submit(self.fdtd.close))
+        finally:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
@@ -1,6 +1,99 @@
+from contextlib import contextmanager
+import copy
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from .cache import LRUCache
 from .session import Connector
 from .definitions import *
 from .spectral_tools import freq_to_wavelength
+from .constants import speed_of_light
+from .instrument import Recorder, InstrumentedSession
+
+# Name of the script variable used to transfer the data in FDTD.collect()
+_COLLECT_VARIABLE = "lumflows_collect"
+
+# Digests of project files per (path, modification time, size), so unchanged files are hashed once
+PROJECT_DIGEST_CACHE = LRUCache(maxsize=64)
+
+# Session commands that set a property; config_hash() only keeps the last value of every property
+_PROPERTY_COMMANDS = ("setnamed", "setglobalmonitor", "setglobalsource", "setglobalmesh")
+
+# Session commands that change the model; they are recorded when called through FDTD.__getattr__
+_MUTATING_COMMANDS = ("setnamed", "set", "setglobalmonitor", "setglobalsource", "setglobalmesh",
+                      "select", "selectall", "unselectall", "selectpartial", "shiftselect",
+                      "delete", "deleteall", "copy", "addtogroup", "groupscope", "eval", "load")
+
+def _canonical(value):
+    """ Converts a property value into a JSON-serializable canonical form. """
+    if isinstance(value, np.ndarray):
+        return {"ndarray": value.tolist(), "dtype": str(value.dtype)}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    return value
+
+def _file_digest(file):
+    digest = hashlib.sha256()
+    with open(file, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _project_signature(file):
+    """ Returns the (path, modification time, size) of a project file, or None if there is no such file. """
+    if not file or not os.path.isfile(file):
+        return None
+
+    file = os.path.abspath(file)
+    stat = os.stat(file)
+    return [file, stat.st_mtime_ns, stat.st_size]
+
+def _project_digest(signature):
+    """
+    Returns the digest of the project file with the given signature, hashing it only once.
+
+    Returns None if the file has changed since the signature was taken.
+    """
+    key = tuple(signature)
+    digest = PROJECT_DIGEST_CACHE.get(key)
+    if digest is None:
+        # Hash outside of the cache lock, so sessions loading other projects are not held up
+        if _project_signature(signature[0]) != list(signature):
+            return None
+        digest = _file_digest(signature[0])
+        PROJECT_DIGEST_CACHE.put(key, digest)
+
+    return digest
+
+def _to_lsf(value):
+    """ Converts a Python value into a Lumerical script literal. """
+    if isinstance(value, (bool, np.bool_)):
+        return "1" if value else "0"
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        return repr(float(value))
+    if isinstance(value, str):
+        if '"' not in value:
+            return f'"{value}"'
+        if "'" not in value:
+            return f"'{value}'"
+        raise ValueError(f"The string {value!r} cannot be quoted in a Lumerical script.")
+    if isinstance(value, (list, tuple, np.ndarray)):
+        matrix = np.atleast_1d(np.asarray(value, dtype=float))
+        if matrix.ndim == 1:
+            matrix = matrix[:, np.newaxis]
+        if matrix.ndim != 2:
+            raise ValueError("Only scalars, vectors and matrices can be passed to a Lumerical script.")
+        return "[" + ";".join(",".join(repr(float(x)) for x in row) for row in matrix) + "]"
+
+    raise TypeError(f"Unsupported property value type: {type(value).__name__}.")
 
 class FDTD:
     ######################################################################
@@ -40,13 +133,27 @@ class FDTD:
         units : float, optional, default=nm
             A scaling factor for object dimensions and wavelengths.
         """
-        connector = Connector
-        self.api = connector.connect()        
+        self.api = Connector().connect()
         self.fdtd = self.api.FDTD(filename=filename, hide=hide, serverArgs=serverArgs, remoteArgs=remoteArgs)
 
         self.units = units
         self.monitors = []
 
+        # Canonical record of the model set up through the helpers, see config_hash()
+        self.config = None
+        self._record("new", _project_signature(filename))
+        self.monitor_names = []
+
+        # Property changes queued by batch(), and the number of API round-trips saved so far
+        self._batch = None
+        self.roundtrips_saved = 0
+
+        # Project variants waiting for run_queued()
+        self.jobs = []
+
+        # Set by enable_instrumentation()
+        self.recorder = None
+
 
     ######################################################################
     #                                                                    #
@@ -55,7 +162,311 @@ class FDTD:
     ######################################################################
     def __getattr__(self, mathod):
         # Delegate method calls to `self.fdtd` for missing attributes.
-        return getattr(self.fdtd, mathod)
+        # Guard against infinite recursion while `self.fdtd` is not set (e.g. a failed __init__ or unpickling).
+        if mathod.startswith("__") or "fdtd" not in self.__dict__:
+            raise AttributeError(mathod)
+
+        attribute = getattr(self.fdtd, mathod)
+        if mathod in _MUTATING_COMMANDS or mathod.startswith("add"):
+            return self._recorded(mathod, attribute)
+
+        return attribute
+
+
+    ######################################################################
+    #                                                                    #
+    # _recorded                                                          #
+    #                                                                    #
+    ######################################################################
+    def _recorded(self, name, call):
+        # Wraps a delegated session command that changes the model, so that it enters config_hash()
+        def _call(*args, **kwargs):
+            value = call(*args, **kwargs)
+            if name == "load" and args:
+                self._record(name, _project_signature(args[0]))
+            else:
+                self._record(name, *args, **kwargs)
+            return value
+
+        return _call
+
+
+    ######################################################################
+    #                                                                    #
+    # enable_instrumentation                                             #
+    #                                                                    #
+    ######################################################################
+    def enable_instrumentation(self, recorder = None):
+        """
+        Starts recording the timing of every lumapi call of the session.
+
+        Parameters:
+        -----------
+        recorder : Recorder, optional
+            Collects the events; share one recorder between sessions to get a single timeline.
+            A new recorder is created by default.
+
+        Returns:
+        --------
+        Recorder
+            The recorder, see Recorder.summary() and Recorder.to_chrome_trace().
+
+        Notes:
+        ------
+        - Both the calls made by the methods of this class and the calls delegated to the
+          session are recorded; solver runs are reported separately from interop calls.
+        - Use recorder.section(name) to time Python post-processing on the same timeline.
+        - Disabled instrumentation adds no overhead: the session is only wrapped while enabled.
+        """
+        if self.recorder is None:
+            self.recorder = Recorder() if recorder is None else recorder
+            self.fdtd = InstrumentedSession(self.fdtd, self.recorder)
+
+        return self.recorder
+
+
+    ######################################################################
+    #                                                                    #
+    # disable_instrumentation                                            #
+    #                                                                    #
+    ######################################################################
+    def disable_instrumentation(self):
+        """ Stops recording and returns the recorder with the events recorded so far. """
+        recorder = self.recorder
+        if recorder is not None:
+            self.fdtd = self.fdtd.session
+            self.recorder = None
+
+        return recorder
+
+
+    ######################################################################
+    #                                                                    #
+    # _record                                                            #
+    #                                                                    #
+    ######################################################################
+    def _record(self, operation, *args, **kwargs):
+        # A new or loaded project starts a new record; properties are kept by (object, property),
+        # so only their current values count, and the other commands in the order they were sent
+        if operation in ("new", "load"):
+            self.config = {"project": args[0], "properties": {}, "commands": []}
+        elif operation in _PROPERTY_COMMANDS and len(args) == (3 if operation == "setnamed" else 2) and not kwargs:
+            key = tuple(args[:2]) if operation == "setnamed" else (operation, args[0])
+            self.config["properties"][key] = _canonical(args[-1])
+        else:
+            self.config["commands"].append([operation, _canonical(list(args)), _canonical(kwargs)])
+
+
+    ######################################################################
+    #                                                                    #
+    # config_hash                                                        #
+    #                                                                    #
+    ######################################################################
+    def config_hash(self):
+        """
+        Returns a hash of the model configuration recorded by the helpers.
+
+        Notes:
+        ------
+        - Every object added and every property set through the helpers of this class is
+          recorded once it has been sent, including the content of the loaded project files.
+        - Delegated session commands that change the model (e.g. `fdtd.setnamed(...)`,
+          `fdtd.set(...)`, `fdtd.addrect(...)`, `fdtd.eval(...)`) are recorded as well. Other
+          delegated commands are not; make model changes through the helpers or these commands.
+        - Creating or loading a project starts a new record. Properties count with their current
+          value only, so sessions that reach the same model through different histories share
+          the hash; the other commands count in the order they were sent.
+        - Project files are hashed here, on first use, and the digest is reused until the file
+          changes. A project that changed on disk since it was loaded is identified by its
+          path, modification time and size instead.
+        """
+        project = self.config["project"]
+        if project is not None:
+            digest = _project_digest(project)
+            project = {"digest": digest} if digest is not None else {"file": project}
+
+        state = {"project": project, "commands": self.config["commands"],
+                 "properties": [[*key, value] for key, value in sorted(self.config["properties"].items(), key=lambda item: item[0])]}
+        canonical = json.dumps(state, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+    ######################################################################
+    #                                                                    #
+    # run_cached                                                         #
+    #                                                                    #
+    ######################################################################
+    def run_cached(self, cache, extract = None):
+        """
+        Runs the current simulation unless its results are already in the cache.
+
+        Parameters:
+        -----------
+        cache : ResultCache
+            The on-disk cache of extracted results.
+
+        extract : callable, optional
+            extract(fdtd) returns the results of a finished run as a dictionary of arrays.
+            Defaults to collect().
+
+        Returns:
+        --------
+        dict
+            The extracted results, either from the cache or from a new run.
+
+        Notes:
+        ------
+        - The solver saves its results into the current project file. To keep the loaded project
+          (and so its digest) unchanged, the model is saved to a scratch project in the cache
+          directory and run there; the scratch project is removed after the extraction.
+        """
+        key = self.config_hash()
+        result = cache.get(key)
+        if result is not None:
+            return result
+
+        file = os.path.join(os.path.abspath(cache.directory), key + ".fsp")
+        self.fdtd.save(file)
+        try:
+            self.run_simulation()
+            result = self.collect() if extract is None else extract(self)
+        finally:
+            try:
+                os.remove(file)
+            except OSError:
+                pass
+
+        cache.put(key, result)
+
+        return result
+
+
+    ######################################################################
+    #                                                                    #
+    # _setnamed                                                          #
+    #                                                                    #
+    ######################################################################
+    def _setnamed(self, object_name, prop, value):
+        # All property setters go through here, so that they can be batched and recorded
+        self._send(("setnamed", object_name, prop, value),
+                   lambda: f"setnamed({_to_lsf(object_name)}, {_to_lsf(prop)}, {_to_lsf(value)});",
+                   self.fdtd.setnamed, object_name, prop, value)
+
+
+    ######################################################################
+    #                                                                    #
+    # _setglobalmonitor                                                  #
+    #                                                                    #
+    ######################################################################
+    def _setglobalmonitor(self, prop, value):
+        self._send(("setglobalmonitor", prop, value),
+                   lambda: f"setglobalmonitor({_to_lsf(prop)}, {_to_lsf(value)});",
+                   self.fdtd.setglobalmonitor, prop, value)
+
+
+    ######################################################################
+    #                                                                    #
+    # _send                                                              #
+    #                                                                    #
+    ######################################################################
+    def _send(self, record, command, call, *args):
+        # Queue the script command within a batch, call the session directly otherwise.
+        # Values without a script literal (e.g. None or lists of strings) are always set
+        # directly; the changes queued before are sent first to keep their order.
+        # The change is recorded only once it has been sent.
+        if self._batch is not None:
+            try:
+                self._batch.append((command(), record))
+                return
+            except (TypeError, ValueError):
+                self._flush_batch()
+
+        call(*args)
+        self._record(*record)
+
+
+    ######################################################################
+    #                                                                    #
+    # _flush_batch                                                       #
+    #                                                                    #
+    ######################################################################
+    def _flush_batch(self):
+        queued = self._batch
+        self._batch = []
+        if queued:
+            self.fdtd.eval("\n".join(command for command, _ in queued))
+            self.roundtrips_saved += len(queued) - 1
+            for _, record in queued:
+                self._record(*record)
+
+
+    ######################################################################
+    #                                                                    #
+    # batch                                                              #
+    #                                                                    #
+    ######################################################################
+    @contextmanager
+    def batch(self):
+        """
+        Collects the property changes made by the helpers within the block and sends
+        them to the solver in a single call.
+
+        Example:
+            with fdtd.batch():
+                fdtd.set_bc_x(BC_PERIODIC, BC_PERIODIC)
+                fdtd.set_bc_z()
+                fdtd.set_pml_profile()
+
+        Notes:
+        ------
+        - The changes are sent as one generated Lumerical script through `eval`.
+        - Nested blocks are merged into the outermost one.
+        - If the block raises an exception, the queued changes are discarded.
+        - Values that cannot be written as script literals (e.g. None, lists of strings) are
+          set directly, after sending the changes queued so far.
+        - Only property setters are batched; other calls (adding objects, running, delegated
+          session calls such as `fdtd.setnamed(...)`) are executed immediately.
+        """
+        if self._batch is not None:
+            yield self
+            return
+
+        self._batch = []
+        try:
+            yield self
+            self._flush_batch()
+        finally:
+            self._batch = None
+
+
+    ######################################################################
+    #                                                                    #
+    # configure                                                          #
+    #                                                                    #
+    ######################################################################
+    def configure(self, object_name, properties):
+        """
+        Sets several properties of a simulation object in a single call.
+
+        Parameters:
+        -----------
+        object_name : str
+            The name of the simulation object (e.g. "FDTD").
+
+        properties : dict
+            The property names and their values, e.g. {BC_X_MIN: BC_PML, BC_X_MAX: BC_PML}.
+
+        Returns:
+        --------
+        int
+            The number of API round-trips saved by batching.
+        """
+        saved = self.roundtrips_saved
+        with self.batch():
+            for prop, value in properties.items():
+                self._setnamed(object_name, prop, value)
+
+        return self.roundtrips_saved - saved
 
 
     ######################################################################
@@ -87,6 +498,7 @@ class FDTD:
         - If the project file contains simulation results, they will also be loaded.
         """
         self.fdtd.load(file + ".fsp")
+        self._record("load", _project_signature(file + ".fsp"))
 
 
     ######################################################################
@@ -106,6 +518,145 @@ class FDTD:
         self.fdtd.run()
 
 
+    ######################################################################
+    #                                                                    #
+    # queue_variant                                                      #
+    #                                                                    #
+    ######################################################################
+    def queue_variant(self, name, overrides):
+        """
+        Saves a variant of the current model as a separate project and queues it for run_queued().
+
+        Parameters:
+        -----------
+        name : str
+            The name of the project file of the variant (without the extension).
+
+        overrides : dict
+            The property changes of the variant, e.g. {"source": {LIGHT_SRC_AOI_THETA: 30}}.
+
+        Returns:
+        --------
+        str
+            The path of the saved project file.
+
+        Notes:
+        ------
+        - The overridden properties are restored after saving, so variants do not accumulate.
+        """
+        self.switch_to_layout()
+        # The variant is a temporary change, keep it out of the recorded configuration
+        config = copy.deepcopy(self.config)
+        original = {object_name: {prop: self.fdtd.getnamed(object_name, prop) for prop in properties}
+                    for object_name, properties in overrides.items()}
+
+        with self.batch():
+            for object_name, properties in overrides.items():
+                for prop, value in properties.items():
+                    self._setnamed(object_name, prop, value)
+
+        file = os.path.abspath(name + ".fsp")
+        self.fdtd.save(file)
+
+        with self.batch():
+            for object_name, properties in original.items():
+                for prop, value in properties.items():
+                    self._setnamed(object_name, prop, value)
+
+        self.config = config
+        self.jobs.append({"name": name, "file": file})
+        return file
+
+
+    ######################################################################
+    #                                                                    #
+    # run_queued                                                         #
+    #                                                                    #
+    ######################################################################
+    def run_queued(self, max_concurrent = None, extract = None, progress = None):
+        """
+        Runs all queued variants with the solver job manager and loads them back for extraction.
+
+        Parameters:
+        -----------
+        max_concurrent : int, optional
+            The maximum number of jobs handed to the job manager at once. By default all
+            jobs are submitted together and the configured resources decide the concurrency.
+
+        extract : callable, optional
+            extract(fdtd, name) is called with each finished project loaded in this session.
+
+        progress : callable, optional
+            progress(done, total, record) is called for every job once its group has finished.
+
+        Returns:
+        --------
+        dict
+            One record per variant name with the keys "file", "error", "elapsed", "group_elapsed"
+            and "result". "error" is None if the job wrote its results, a RuntimeError otherwise;
+            failed jobs are not extracted.
+
+        Notes:
+        ------
+        - `runjobs` blocks until the whole group has finished, so progress is reported per group:
+          all jobs of a group are reported at once after the group. Use `max_concurrent` to get
+          intermediate progress.
+        - Run times are only measured per group ("group_elapsed"). "elapsed" is the time from
+          the submission of the group until the project file of the job was written; it includes
+          the time the job waited for the others and is None for failed jobs.
+        - A job counts as failed if its project file was not rewritten by the solver.
+        - After the call the session holds the last loaded variant, and config_hash() describes
+          that variant.
+        """
+        jobs, self.jobs = self.jobs, []
+        group_size = len(jobs) if max_concurrent is None else max_concurrent
+        records, done = {}, 0
+
+        def _signature(file):
+            try:
+                stat = os.stat(file)
+                return stat.st_mtime_ns, stat.st_size
+            except FileNotFoundError:
+                return None
+
+        for start in range(0, len(jobs), max(1, group_size)):
+            group = jobs[start:start + group_size]
+
+            self.fdtd.clearjobs()
+            for job in group:
+                self.fdtd.addjob(job["file"])
+
+            submitted = {job["file"]: _signature(job["file"]) for job in group}
+            started = time.time()
+            self.fdtd.runjobs()
+            finished = time.time()
+
+            for job in group:
+                record = {"file": job["file"], "error": None, "elapsed": None,
+                          "group_elapsed": finished - started, "result": None}
+
+                # The solver writes the results into the project file once the job is done
+                signature = _signature(job["file"])
+                if signature is None or signature == submitted[job["file"]]:
+                    record["error"] = RuntimeError(f"The job '{job['name']}' did not write any results.")
+                else:
+                    written = signature[0] * 1e-9
+                    record["elapsed"] = min(max(written - started, 0.0), finished - started)
+
+                    if extract is not None:
+                        self.fdtd.load(job["file"])
+                        self._record("load", _project_signature(job["file"]))
+                        record["result"] = extract(self, job["name"])
+
+                records[job["name"]] = record
+                done += 1
+                if progress is not None:
+                    progress(done, len(jobs), record)
+
+        self.fdtd.clearjobs()
+        return records
+
+
     ######################################################################
     #                                                                    #
     # switch_to_layout                                                   #
@@ -127,7 +678,7 @@ class FDTD:
         """
         Disables a specified simulation object.
         """
-        self.fdtd.setnamed(object_name, "enabled", 0)
+        self._setnamed(object_name, "enabled", 0)
 
 
     ######################################################################
@@ -139,7 +690,7 @@ class FDTD:
         """
         Enables a specified simulation object.
         """
-        self.fdtd.setnamed(object_name, "enabled", 1)
+        self._setnamed(object_name, "enabled", 1)
 
 
     ######################################################################
@@ -201,6 +752,71 @@ class FDTD:
         return self.fdtd.transmission(monitor_name)
 
 
+    ######################################################################
+    #                                                                    #
+    # collect                                                            #
+    #                                                                    #
+    ######################################################################
+    def collect(self, monitors = None, quantities = ("T",), as_records = False):
+        """
+        Retrieves several quantities from several monitors in two API calls.
+
+        Parameters:
+        -----------
+        monitors : list of str, optional
+            The names of the monitors. Defaults to all monitors added with add_power_monitor().
+
+        quantities : list of str
+            The quantities to retrieve from every monitor. "T" stands for the transmitted
+            power (see get_transmitted_power()); any other name is passed to `getdata`.
+
+        as_records : bool
+            If True, a NumPy record array with one row per frequency point is returned.
+            All quantities must then hold exactly one value per frequency point.
+
+        Returns:
+        --------
+        dict or recarray
+            The shared frequency axis "f", the corresponding "wavelengths" and one array per
+            "<monitor>/<quantity>" key (or field).
+
+        Notes:
+        ------
+        - All retrievals are packed into one generated Lumerical script that stores the
+          results in a struct, which is then fetched at once with `getv`.
+        - The frequency axis is taken from the first monitor only.
+        """
+        if monitors is None:
+            monitors = self.monitor_names
+        if not monitors:
+            raise ValueError("No monitors to collect the data from.")
+
+        keys = [f"{monitor}/{quantity}" for monitor in monitors for quantity in quantities]
+
+        script = [f"{_COLLECT_VARIABLE} = struct;",
+                  f"{_COLLECT_VARIABLE}.f = getdata({_to_lsf(monitors[0])}, \"f\");"]
+        for i, (monitor, quantity) in enumerate((monitor, quantity) for monitor in monitors for quantity in quantities):
+            if quantity == "T":
+                call = f"transmission({_to_lsf(monitor)})"
+            else:
+                call = f"getdata({_to_lsf(monitor)}, {_to_lsf(quantity)})"
+            script.append(f"{_COLLECT_VARIABLE}.q{i} = {call};")
+
+        self.fdtd.eval("\n".join(script))
+        raw = self.fdtd.getv(_COLLECT_VARIABLE)
+
+        f = np.asarray(raw["f"]).flatten()
+        result = {"f": f, "wavelengths": freq_to_wavelength(f)}
+        for i, key in enumerate(keys):
+            value = np.asarray(raw[f"q{i}"])
+            result[key] = value.flatten() if value.size == f.size else value
+
+        if as_records is True:
+            return np.rec.fromarrays(list(result.values()), names=list(result.keys()))
+
+        return result
+
+
     ######################################################################
     #                                                                    #
     # add_fdtd_region_with_span                                          #
@@ -221,7 +837,9 @@ class FDTD:
         x_span, y_span, z_span: float
             Span in x, y and z coordinates.
         """
-        self.fdtd.addfdtd(dimension=dimension, **self._update_units(**kwargs))
+        kwargs = self._update_units(**kwargs)
+        self.fdtd.addfdtd(dimension=dimension, **kwargs)
+        self._record("addfdtd", dimension=dimension, **kwargs)
 
 
     ######################################################################
@@ -244,7 +862,9 @@ class FDTD:
         x_max, y_max, z_max: float
             Maximum in x, y and z coordinates.
         """
-        self.fdtd.addfdtd(dimension=dimension, **self._update_units(**kwargs))
+        kwargs = self._update_units(**kwargs)
+        self.fdtd.addfdtd(dimension=dimension, **kwargs)
+        self._record("addfdtd", dimension=dimension, **kwargs)
 
 
     ######################################################################
@@ -261,7 +881,7 @@ class FDTD:
         mesh_type: str
             Type of the mesh to be used (e.g. "auto non-uniform" or "uniform").
         """
-        self.fdtd.setnamed(FDTD_DOMAIN, MESH_TYPE, mesh_type)
+        self._setnamed(FDTD_DOMAIN, MESH_TYPE, mesh_type)
 
 
     ######################################################################
@@ -278,7 +898,7 @@ class FDTD:
         mesh_technology: str
             The mesh refinement technology to be used (e.g. "conformal variant 0", "conformal variant 1", etc.).
         """
-        self.fdtd.setnamed(FDTD_DOMAIN, MESH_REFINEMENT, mesh_technology)
+        self._setnamed(FDTD_DOMAIN, MESH_REFINEMENT, mesh_technology)
 
 
     ######################################################################
@@ -295,7 +915,7 @@ class FDTD:
         symmetry: bool
             If True, all boundary conditions will use symmetry.
         """
-        self.fdtd.setnamed(FDTD_DOMAIN, ALL_BC_SYMMETRY, symmetry)
+        self._setnamed(FDTD_DOMAIN, ALL_BC_SYMMETRY, symmetry)
 
 
     ######################################################################
@@ -314,8 +934,8 @@ class FDTD:
         bc_max: str
             Boundary condition for X_max (e.g., "periodic", "PML").
         """
-        self.fdtd.setnamed(FDTD_DOMAIN, BC_X_MIN, bc_min)
-        self.fdtd.setnamed(FDTD_DOMAIN, BC_X_MAX, bc_max)
+        self._setnamed(FDTD_DOMAIN, BC_X_MIN, bc_min)
+        self._setnamed(FDTD_DOMAIN, BC_X_MAX, bc_max)
 
     ######################################################################
     #                                                                    #
@@ -333,8 +953,8 @@ class FDTD:
         bc_max: str
             Boundary condition for Y_max (e.g., "periodic", "PML").
         """
-        self.fdtd.setnamed(FDTD_DOMAIN, BC_Y_MIN, bc_min)
-        self.fdtd.setnamed(FDTD_DOMAIN, BC_Y_MAX, bc_max)
+        self._setnamed(FDTD_DOMAIN, BC_Y_MIN, bc_min)
+        self._setnamed(FDTD_DOMAIN, BC_Y_MAX, bc_max)
 
     ######################################################################
     #                                                                    #
@@ -352,8 +972,8 @@ class FDTD:
         bc_max: str
             Boundary condition for Z_max (e.g., "PML", "periodic").
         """
-        self.fdtd.setnamed(FDTD_DOMAIN, BC_Z_MIN, bc_min)
-        self.fdtd.setnamed(FDTD_DOMAIN, BC_Z_MAX, bc_max)
+        self._setnamed(FDTD_DOMAIN, BC_Z_MIN, bc_min)
+        self._setnamed(FDTD_DOMAIN, BC_Z_MAX, bc_max)
 
 
     ######################################################################
@@ -362,7 +982,7 @@ class FDTD:
     #                                                                    #
     ######################################################################
     def set_pml_profile(self, pml_profile = PML_STEEP_ANGLE):
-        self.fdtd.setnamed(FDTD_DOMAIN, PML_PROFILE, pml_profile)
+        self._setnamed(FDTD_DOMAIN, PML_PROFILE, pml_profile)
 
 
     ######################################################################
@@ -371,7 +991,7 @@ class FDTD:
     #                                                                    #
     ######################################################################
     def set_number_of_pml_layers(self, number_of_layers = 32):
-        self.fdtd.setnamed(FDTD_DOMAIN, PML_LAYERS, number_of_layers)
+        self._setnamed(FDTD_DOMAIN, PML_LAYERS, number_of_layers)
 
 
     ######################################################################
@@ -404,7 +1024,10 @@ class FDTD:
             Maximum in x, y and z coordinates.
         """
         print("Adding monitor to the simulation...")
-        self.monitors.append(self.fdtd.addpower(name=name, monitor_type=monitor_type, **self._update_units(**kwargs)))
+        self.monitor_names.append(name)
+        kwargs = self._update_units(**kwargs)
+        self.monitors.append(self.fdtd.addpower(name=name, monitor_type=monitor_type, **kwargs))
+        self._record("addpower", name=name, monitor_type=monitor_type, **kwargs)
 
 
     ######################################################################
@@ -413,7 +1036,7 @@ class FDTD:
     #                                                                    #
     ######################################################################
     def set_global_monitor_option(self, key, value):
-        self.fdtd.setglobalmonitor(key, value)
+        self._setglobalmonitor(key, value)
 
 
     ######################################################################
@@ -425,13 +1048,43 @@ class FDTD:
         self.set_global_monitor_option(FDP_MONITOR_FREQ_POINTS, number_of_points)
 
 
+    ######################################################################
+    #                                                                    #
+    # set_wavelength_samples                                             #
+    #                                                                    #
+    ######################################################################
+    def set_wavelength_samples(self, wvls, monitor_name = None):
+        """
+        Sample the monitors at the given (e.g. non-uniform) wavelengths instead of a uniform grid.
+
+        Parameters:
+        -----------
+        wvls: ndarray
+            The wavelengths in nm, e.g. a grid from sampling.adaptive_grid().
+
+        monitor_name: str, optional
+            If given, only this monitor is set (overriding the global monitor settings);
+            otherwise the global monitor settings are changed.
+        """
+        frequencies = speed_of_light / (np.sort(np.asarray(wvls, dtype=float))[::-1] * 1e-9)
+
+        with self.batch():
+            if monitor_name is None:
+                self._setglobalmonitor(FDP_MONITOR_SAMPLE_SPACING, SAMPLE_SPACING_CUSTOM)
+                self._setglobalmonitor(FDP_MONITOR_CUSTOM_SAMPLES, frequencies)
+            else:
+                self._setnamed(monitor_name, FDP_MONITOR_OVERRIDE_GLOBAL, True)
+                self._setnamed(monitor_name, FDP_MONITOR_SAMPLE_SPACING, SAMPLE_SPACING_CUSTOM)
+                self._setnamed(monitor_name, FDP_MONITOR_CUSTOM_SAMPLES, frequencies)
+
+
     ######################################################################
     #                                                                    #
     # set_monitor_option                                                 #
     #                                                                    #
     ######################################################################
     def set_monitor_option(self, monitor_name, option, value):
-        self.fdtd.setnamed(monitor_name, option, value)
+        self._setnamed(monitor_name, option, value)
 
 
     ######################################################################
@@ -466,7 +1119,9 @@ class FDTD:
         x_max, y_max, z_max: float (optional)
             Maximum in x, y and z coordinates.
         """
-        self.fdtd.addplane(name=name, wavelength_start=wavelength_start, wavelength_stop=wavelength_stop, **self._update_units(**kwargs))
+        kwargs = self._update_units(**kwargs)
+        self.fdtd.addplane(name=name, wavelength_start=wavelength_start, wavelength_stop=wavelength_stop, **kwargs)
+        self._record("addplane", name=name, wavelength_start=wavelength_start, wavelength_stop=wavelength_stop, **kwargs)
   
 
     ######################################################################
@@ -475,7 +1130,7 @@ class FDTD:
     #                                                                    #
     ######################################################################
     def set_source_option(self, source_name, option, value):
-        self.fdtd.setnamed(source_name, option, value)
+        self._setnamed(source_name, option, value)
 
 
     ######################################################################
@@ -0,0 +1,191 @@
+# This module provides the in-memory and on-disk caches used by the package
+
+from collections import OrderedDict
+import os
+import threading
+import numpy as np
+
+class LRUCache():
+    def __init__(self, maxsize = 128):
+        """
+        A thread-safe least-recently-used cache with hit/miss counters.
+
+        Parameters:
+        -----------
+        maxsize : int
+            Maximum number of entries kept in the cache. The least recently used
+            entry is evicted once the limit is exceeded.
+        """
+        if maxsize < 1:
+            raise ValueError("The cache must be able to hold at least one entry.")
+
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def get(self, key, default = None):
+        """ Returns the cached value and marks it as recently used. """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """ Stores a value, evicting the least recently used entries if needed. """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value for the key, computing and storing it on a miss.
+
+        The lock is held while computing, so concurrent requests for the same key
+        compute the value only once.
+        """
+        with self._lock:
+            sentinel = object()
+            value = self.get(key, sentinel)
+            if value is sentinel:
+                value = compute()
+                self.put(key, value)
+            return value
+
+    def resize(self, maxsize):
+        """ Changes the eviction limit, dropping the oldest entries if necessary. """
+        if maxsize < 1:
+            raise ValueError("The cache must be able to hold at least one entry.")
+
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """ Drops all entries and resets the counters. """
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def info(self):
+        """ Returns the cache statistics as a dictionary. """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(self._data), "maxsize": self.maxsize}
+
+class ResultCache():
+    def __init__(self, directory, max_bytes = 1 << 30):
+        """
+        A content-addressed on-disk cache of simulation results.
+
+        Every entry is a compressed `.npz` file named after its key (e.g. a config hash).
+        Reading an entry refreshes its modification time, and the least recently used
+        entries are evicted once the total size exceeds `max_bytes`.
+
+        Parameters:
+        -----------
+        directory : str
+            The cache directory. It is created if it does not exist.
+        max_bytes : int
+            The size limit of the cache.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npz"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((stat.st_mtime_ns, stat.st_size, name))
+        return entries
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        """ Returns the cached dictionary of arrays, or None on a miss. """
+        path = self._path(key)
+        with self._lock:
+            try:
+                with np.load(path, allow_pickle=False) as data:
+                    result = {name: data[name] for name in data.files}
+                os.utime(path)
+            except FileNotFoundError:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return result
+
+    def put(self, key, result):
+        """ Stores a dictionary of arrays and evicts old entries if the size limit is exceeded. """
+        path = self._path(key)
+        tmp = path + f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            np.savez_compressed(f, **result)
+
+        with self._lock:
+            os.replace(tmp, path)
+            self._evict()
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        # Never evict the most recent entry, even if it alone exceeds the limit
+        for _, size, name in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        """ Removes all entries and resets the counters. """
+        with self._lock:
+            for _, _, name in self._entries():
+                os.remove(os.path.join(self.directory, name))
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def info(self):
+        """ Returns the cache statistics as a dictionary. """
+        with self._lock:
+            entries = self._entries()
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "size": len(entries), "bytes": sum(size for _, size, _ in entries), "max_bytes": self.max_bytes}
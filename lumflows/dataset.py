@@ -0,0 +1,182 @@
+# This module stores the spectra of a whole sweep in a single chunked HDF5 file
+
+import json
+import threading
+import numpy as np
+from .io import RTA_CHANNELS
+
+# Spectral channels stored for every run (RTA_CHANNELS without the wavelengths)
+CHANNELS = RTA_CHANNELS[1:]
+
+class SweepDataset():
+    def __init__(self, path, mode = "a", wvls = None, parameters = None, compression = "gzip", chunk_runs = 64, chunk_wvls = 1024):
+        """
+        A single on-disk dataset holding the spectra of all runs of a sweep, indexed by the sweep parameters.
+
+        Layout of the HDF5 file:
+        - "wavelengths": (n_wvl,) the wavelength grid shared by all runs.
+        - "spectra": (n_runs, 6, n_wvl) the R_f, T_f, R_r, T_r, R and T channels of every run.
+        - "parameters": (n_runs, n_parameters) the numeric sweep parameters of every run.
+
+        The runs axis is resizable, so runs can be appended as they finish. The chunks span
+        `chunk_runs` runs of one channel over `chunk_wvls` wavelengths, so that both a single
+        run and a wavelength slice across all runs are read without touching the rest of the file.
+
+        Parameters:
+        -----------
+        path : str
+            The HDF5 file.
+
+        mode : str
+            The h5py file mode ("r", "r+", "a", "w").
+
+        wvls : ndarray, optional
+            The wavelength grid; required when a new dataset is created. When an existing
+            dataset is opened, it must match the stored grid.
+
+        parameters : list of str, optional
+            The names of the sweep parameters; required when a new dataset is created. When
+            an existing dataset is opened, they must match the stored names.
+
+        compression : str, optional
+            The h5py compression filter (e.g. "gzip", "lzf" or None).
+
+        Notes:
+        ------
+        - Appends are serialized by a lock, so the dataset can be filled from the worker
+          threads of a SweepRunner. Use a single SweepDataset per file and process.
+        """
+        # h5py is only needed here, keep it out of the package import
+        import h5py
+
+        self.file = h5py.File(path, mode)
+
+        if "spectra" not in self.file:
+            if wvls is None or parameters is None:
+                raise ValueError("The wavelengths and parameter names are required to create a new dataset.")
+
+            wvls = np.asarray(wvls, dtype=np.float64)
+            n_wvl = len(wvls)
+            self.file.create_dataset("wavelengths", data=wvls)
+            self.file.create_dataset("spectra", shape=(0, len(CHANNELS), n_wvl), maxshape=(None, len(CHANNELS), n_wvl),
+                                     dtype=np.float64, chunks=(chunk_runs, 1, min(chunk_wvls, n_wvl)), compression=compression)
+            self.file.create_dataset("parameters", shape=(0, len(parameters)), maxshape=(None, len(parameters)),
+                                     dtype=np.float64, chunks=(max(chunk_runs, 1024), len(parameters)))
+            self.file["parameters"].attrs["names"] = json.dumps(list(parameters))
+
+        self.wvls = self.file["wavelengths"][()]
+        self.spectra = self.file["spectra"]
+        self.parameters = self.file["parameters"]
+        self.parameter_names = json.loads(self.parameters.attrs["names"])
+        self._lock = threading.RLock()
+
+        if wvls is not None and not np.array_equal(np.asarray(wvls, dtype=np.float64), self.wvls):
+            self.file.close()
+            raise ValueError(f"The wavelength grid does not match the grid stored in '{path}'.")
+        if parameters is not None and list(parameters) != self.parameter_names:
+            self.file.close()
+            raise ValueError(f"The sweep parameters {list(parameters)} do not match {self.parameter_names} stored in '{path}'.")
+
+        # In-memory index of parameter points for O(1) lookups
+        self._index = {tuple(row): i for i, row in enumerate(self.parameters[()].tolist())}
+
+    def __len__(self):
+        return self.spectra.shape[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def flush(self):
+        self.file.flush()
+
+    def _key(self, point):
+        missing = set(self.parameter_names) - set(point)
+        if missing:
+            raise KeyError(f"Missing sweep parameters: {', '.join(sorted(missing))}.")
+
+        return tuple(float(point[name]) for name in self.parameter_names)
+
+    def extend(self, points, spectra):
+        """
+        Appends several runs at once.
+
+        Parameters:
+        -----------
+        points : list of dict
+            The sweep parameters of every run.
+
+        spectra : ndarray
+            The spectra with shape (n, 6, n_wvl) in the order R_f, T_f, R_r, T_r, R, T.
+
+        Returns:
+        --------
+        range
+            The indices of the appended runs.
+        """
+        spectra = np.asarray(spectra, dtype=np.float64)
+        keys = [self._key(point) for point in points]
+        if spectra.shape != (len(keys), len(CHANNELS), len(self.wvls)):
+            raise ValueError(f"Expected spectra of shape {(len(keys), len(CHANNELS), len(self.wvls))}, got {spectra.shape}.")
+
+        # Reserving the rows, writing them and indexing them must not interleave with another append
+        with self._lock:
+            start = len(self)
+            stop = start + len(keys)
+            self.spectra.resize(stop, axis=0)
+            self.parameters.resize(stop, axis=0)
+            self.spectra[start:stop] = spectra
+            self.parameters[start:stop] = np.array(keys, dtype=np.float64).reshape(len(keys), len(self.parameter_names))
+
+            for i, key in enumerate(keys, start):
+                self._index[key] = i
+
+        return range(start, stop)
+
+    def append(self, point, R_f, T_f, R_r, T_r, R = None, T = None):
+        """
+        Appends the spectra of one run; missing R and T are stored as NaN.
+
+        Returns:
+        --------
+        int
+            The index of the run.
+        """
+        nan = np.full(len(self.wvls), np.nan)
+        spectra = np.stack([np.asarray(channel, dtype=np.float64) if channel is not None else nan
+                            for channel in (R_f, T_f, R_r, T_r, R, T)])
+
+        return self.extend([point], spectra[np.newaxis])[0]
+
+    def find(self, **point):
+        """ Returns the index of the run with the given sweep parameters. """
+        try:
+            return self._index[self._key(point)]
+        except KeyError:
+            raise KeyError(f"No run with parameters {point}.") from None
+
+    def run(self, index):
+        """ Returns the spectra of a run as a dictionary of channels. """
+        return dict(zip(CHANNELS, self.spectra[index]))
+
+    def get(self, **point):
+        """ Returns the spectra of the run with the given sweep parameters. """
+        return self.run(self.find(**point))
+
+    def wavelength_slice(self, start, stop, channel = "R"):
+        """
+        Reads a wavelength range of one channel across all runs.
+
+        Returns:
+        --------
+        tuple
+            The wavelengths within [start, stop] and the (n_runs, n) spectra.
+        """
+        first, last = np.searchsorted(self.wvls, start, side="left"), np.searchsorted(self.wvls, stop, side="right")
+
+        return self.wvls[first:last], self.spectra[:, CHANNELS.index(channel), first:last]
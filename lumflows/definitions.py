@@ -45,6 +45,12 @@ FDP_MONITOR_2D_Z_NORMAL = 7
 FDP_MONITOR_3D = 8
 
 FDP_MONITOR_FREQ_POINTS = "frequency points"
+FDP_MONITOR_SAMPLE_SPACING = "sample spacing"
+FDP_MONITOR_CUSTOM_SAMPLES = "custom frequency samples"
+FDP_MONITOR_OVERRIDE_GLOBAL = "override global monitor settings"
+
+SAMPLE_SPACING_UNIFORM = "uniform"
+SAMPLE_SPACING_CUSTOM = "custom"
 
 FDP_MONITOR_OPTS = ["standard fourier transform", 
                     "partial spectral average", 
@@ -0,0 +1,165 @@
+# This module reduces (stacks of) spectra to spectrally weighted figures of merit
+
+import os
+import numpy as np
+from .cache import LRUCache
+from .utils import _get_db_dir, _grid_hash
+
+# Tabulated weightings (wavelength [nm], value) are read from db/<name>_spectrum.txt
+SPECTRUM_SUFFIX = "_spectrum"
+SOLAR_SPECTRUM = "AM15G"
+
+# Weight vectors precomputed per (weighting, wavelength grid)
+WEIGHTS_CACHE = LRUCache(maxsize=64)
+
+# Multi-lobe Gaussian fits of the CIE 1931 2-degree color matching functions
+# (Wyman, Sloan and Shirley, JCGT 2(2), 2013): (amplitude, center, sigma left, sigma right) in nm
+_CIE_LOBES = {
+    "cie_x": ((1.056, 599.8, 37.9, 31.0), (0.362, 442.0, 16.0, 26.7), (-0.065, 501.1, 20.4, 26.2)),
+    "cie_y": ((0.821, 568.8, 46.9, 40.5), (0.286, 530.9, 16.3, 31.1)),
+    "cie_z": ((1.217, 437.0, 11.8, 36.0), (0.681, 459.0, 26.0, 13.8)),
+}
+
+def _trapezoid_weights(wvls):
+    # Quadrature weights of the trapezoidal rule on an arbitrary (also non-uniform) grid
+    wvls = np.asarray(wvls, dtype=float)
+    weights = np.zeros_like(wvls)
+    steps = np.diff(wvls)
+    weights[:-1] += 0.5 * steps
+    weights[1:] += 0.5 * steps
+
+    return weights
+
+def _cie_function(name, wvls):
+    value = np.zeros_like(wvls)
+    for amplitude, center, sigma_left, sigma_right in _CIE_LOBES[name]:
+        sigma = np.where(wvls < center, sigma_left, sigma_right)
+        value += amplitude * np.exp(-0.5 * ((wvls - center) / sigma) ** 2)
+
+    return value
+
+def _load_weighting_table(name):
+    file = os.path.join(_get_db_dir(), name + SPECTRUM_SUFFIX + ".txt")
+    if not os.path.exists(file):
+        raise FileNotFoundError(f"File '{name + SPECTRUM_SUFFIX}.txt' not found in the database!")
+
+    return np.loadtxt(file, delimiter="\t", skiprows=1).transpose()
+
+def weighting_function(weighting, wvls):
+    """
+    Evaluate a spectral weighting on a wavelength grid (in nm).
+
+    Parameters
+    ----------
+    weighting: str or tuple
+        "photopic" (the CIE 1931 luminosity function), "cie_x", "cie_y", "cie_z", the name of a
+        tabulated spectrum in the database (e.g. "AM15G"), or a (wavelengths, values) pair.
+
+    Returns
+    -------
+    ndarray
+        The weighting on the grid. Tabulated weightings are zero outside their range.
+    """
+    wvls = np.asarray(wvls, dtype=float)
+
+    if isinstance(weighting, str):
+        if weighting == "photopic":
+            return _cie_function("cie_y", wvls)
+        if weighting in _CIE_LOBES:
+            return _cie_function(weighting, wvls)
+        weighting = _load_weighting_table(weighting)
+
+    table_wvls, values = np.asarray(weighting[0], dtype=float), np.asarray(weighting[1], dtype=float)
+    return np.interp(wvls, table_wvls, values, left=0.0, right=0.0)
+
+def get_weights(weighting, wvls):
+    """
+    Return the normalized weight vector of a weighting on a wavelength grid.
+
+    The vector includes the quadrature weights of the (possibly non-uniform) grid and sums
+    to one, so that `spectra @ weights` is the weighted average of the spectra. Named
+    weightings are cached per grid; the returned array is read-only.
+    """
+    def _compute():
+        weights = weighting_function(weighting, wvls) * _trapezoid_weights(wvls)
+        total = np.sum(weights)
+        if total == 0.0:
+            raise RuntimeError("The weighting vanishes on the given wavelength grid.")
+        weights = weights / total
+        weights.setflags(write=False)
+        return weights
+
+    if not isinstance(weighting, str):
+        return _compute()
+
+    return WEIGHTS_CACHE.get_or_compute((weighting, _grid_hash(wvls)), _compute)
+
+def weighted_average(spectra, wvls, weighting):
+    """
+    Reduce spectra to their weighted averages with a single matrix product.
+
+    Parameters
+    ----------
+    spectra: ndarray
+        Spectra of shape (..., n_wvl), e.g. (n_runs, n_wvl).
+    wvls: ndarray
+        The wavelength grid (in nm).
+    weighting: str or tuple
+        See weighting_function().
+
+    Returns
+    -------
+    ndarray
+        The weighted averages with shape (...).
+    """
+    return np.asarray(spectra, dtype=float) @ get_weights(weighting, wvls)
+
+def luminous_average(spectra, wvls):
+    """ Photopically weighted average (e.g. luminous reflectance or transmittance). """
+    return weighted_average(spectra, wvls, "photopic")
+
+def solar_absorptance(R, T, wvls, solar_spectrum = SOLAR_SPECTRUM):
+    """ Solar-weighted absorptance 1 - R - T of (stacks of) spectra. """
+    return weighted_average(1.0 - np.asarray(R, dtype=float) - np.asarray(T, dtype=float), wvls, solar_spectrum)
+
+def color(spectra, wvls, illuminant = None):
+    """
+    Compute the CIE 1931 colors of reflectance or transmittance spectra.
+
+    Parameters
+    ----------
+    spectra: ndarray
+        Spectra of shape (..., n_wvl).
+    wvls: ndarray
+        The wavelength grid (in nm).
+    illuminant: str or tuple, optional
+        The spectral power distribution of the illuminant, see weighting_function().
+        Defaults to the equal-energy illuminant E.
+
+    Returns
+    -------
+    tuple
+        The tristimulus values XYZ with shape (..., 3), normalized so that Y = 1 for a
+        perfect reflector, and the chromaticity coordinates xy with shape (..., 2).
+    """
+    wvls = np.asarray(wvls, dtype=float)
+
+    def _compute():
+        cmf = np.stack([_cie_function(name, wvls) for name in ("cie_x", "cie_y", "cie_z")], axis=-1)
+        power = np.ones_like(wvls) if illuminant is None else weighting_function(illuminant, wvls)
+        weights = cmf * (power * _trapezoid_weights(wvls))[:, np.newaxis]
+        weights = weights / np.sum(weights[:, 1])
+        weights.setflags(write=False)
+        return weights
+
+    if illuminant is None or isinstance(illuminant, str):
+        weights = WEIGHTS_CACHE.get_or_compute(("xyz", illuminant, _grid_hash(wvls)), _compute)
+    else:
+        weights = _compute()
+
+    XYZ = np.asarray(spectra, dtype=float) @ weights
+    total = np.sum(XYZ, axis=-1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        xy = np.where(total > 0.0, XYZ[..., :2] / total, 0.0)
+
+    return XYZ, xy
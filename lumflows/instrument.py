@@ -0,0 +1,153 @@
+# This module records where the time of a simulation workflow goes: solver runs, interop calls and post-processing
+
+from contextlib import contextmanager
+import json
+import threading
+import time
+import numpy as np
+
+# lumapi commands that run the solver, reported as "solver" instead of "interop" time
+SOLVER_COMMANDS = ("run", "runjobs", "runsweep", "runanalysis")
+
+def _nbytes(value):
+    # Size of the arrays returned by a call, also inside the dictionaries returned by getresult()
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(item) for item in value)
+    return 0
+
+class Recorder():
+    def __init__(self):
+        """
+        Collects timed events: lumapi calls of instrumented sessions and user-defined sections.
+
+        Every event has a name, a category ("solver", "interop" or "python"), its start and
+        duration, the bytes of the returned arrays and the thread it ran in.
+        """
+        self.events = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def record(self, name, category, start, duration, nbytes = 0):
+        """ Adds an event; `start` is a time.perf_counter() value. """
+        with self._lock:
+            self.events.append((name, category, start - self._origin, duration, nbytes, threading.get_ident()))
+
+    def clear(self):
+        with self._lock:
+            self.events = []
+
+    @contextmanager
+    def section(self, name):
+        """
+        Times a block of Python code, e.g. post-processing.
+
+        Example:
+            with recorder.section("backside correction"):
+                R, T = compute_with_backside(...)
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, "python", start, time.perf_counter() - start)
+
+    def stats(self):
+        """
+        Aggregates the events by name.
+
+        Returns:
+        --------
+        dict
+            name -> {"category", "calls", "total", "mean", "max", "bytes"}, times in seconds.
+        """
+        stats = {}
+        with self._lock:
+            events = list(self.events)
+
+        for name, category, _, duration, nbytes, _ in events:
+            entry = stats.setdefault(name, {"category": category, "calls": 0, "total": 0.0, "max": 0.0, "bytes": 0})
+            entry["calls"] += 1
+            entry["total"] += duration
+            entry["max"] = max(entry["max"], duration)
+            entry["bytes"] += nbytes
+
+        for entry in stats.values():
+            entry["mean"] = entry["total"] / entry["calls"]
+
+        return stats
+
+    def summary(self):
+        """ Returns the statistics as a text table, sorted by total time, with totals per category. """
+        stats = sorted(self.stats().items(), key=lambda item: item[1]["total"], reverse=True)
+
+        lines = [f"{'name':<32} {'category':<8} {'calls':>7} {'total [s]':>11} {'mean [ms]':>11} {'max [ms]':>11} {'bytes':>12}"]
+        for name, entry in stats:
+            lines.append(f"{name:<32} {entry['category']:<8} {entry['calls']:>7} {entry['total']:>11.4f} "
+                         f"{entry['mean'] * 1e3:>11.3f} {entry['max'] * 1e3:>11.3f} {entry['bytes']:>12}")
+
+        lines.append("")
+        for category in ("solver", "interop", "python"):
+            total = sum(entry["total"] for _, entry in stats if entry["category"] == category)
+            lines.append(f"{category:<8} {total:.4f} s")
+
+        return "\n".join(lines)
+
+    def to_chrome_trace(self, file = None):
+        """
+        Exports the events in the Chrome trace event format (chrome://tracing, Perfetto).
+
+        Parameters:
+        -----------
+        file : str, optional
+            If given, the trace is also written to this JSON file.
+
+        Returns:
+        --------
+        dict
+            The trace.
+        """
+        with self._lock:
+            events = list(self.events)
+
+        trace = {"traceEvents": [{"name": name, "cat": category, "ph": "X", "ts": start * 1e6, "dur": duration * 1e6,
+                                  "pid": 0, "tid": thread, "args": {"bytes": nbytes}}
+                                 for name, category, start, duration, nbytes, thread in events],
+                 "displayTimeUnit": "ms"}
+
+        if file is not None:
+            with open(file, "w") as f:
+                json.dump(trace, f)
+
+        return trace
+
+class InstrumentedSession():
+    def __init__(self, session, recorder):
+        """ Wraps a lumapi session and records the timing of every method call in `recorder`. """
+        self.session = session
+        self.recorder = recorder
+
+    def __getattr__(self, name):
+        if name.startswith("__") or "session" not in self.__dict__:
+            raise AttributeError(name)
+
+        attribute = getattr(self.session, name)
+        if not callable(attribute):
+            return attribute
+
+        category = "solver" if name in SOLVER_COMMANDS else "interop"
+        recorder = self.recorder
+
+        def _timed(*args, **kwargs):
+            start = time.perf_counter()
+            value = None
+            try:
+                value = attribute(*args, **kwargs)
+                return value
+            finally:
+                recorder.record(name, category, start, time.perf_counter() - start, _nbytes(value))
+
+        return _timed
@@ -1,66 +1,162 @@
+import os
 import numpy as np
-import csv
-from .utils import num_points
+from .utils import num_points, _get_db_dir, DISPERSION_SUFFIX, EXTENSION
+from .matdb import build_material_db
 
-def to_file(wvls, R_f, T_f, R_r, T_r, R = None, T = None, filename=None):
+RTA_CHANNELS = ("wvls", "R_f", "T_f", "R_r", "T_r", "R", "T")
+RTA_EXTENSIONS = {"txt": ".txt", "npy": ".npy", "npz": ".npz", "columns": ""}
+
+def _write_rows(f, matrix, fmt = "%.5f", delimiter = ", ", chunk_rows = 65536):
+    # Format whole blocks of rows with a single %-operation instead of one call per value
+    if matrix.shape[0] == 0:
+        return
+    fmt = [fmt] * matrix.shape[1] if isinstance(fmt, str) else fmt
+    row = delimiter.join(fmt) + "\n"
+    for start in range(0, matrix.shape[0], chunk_rows):
+        block = matrix[start:start + chunk_rows]
+        f.write((row * block.shape[0]) % tuple(block.ravel().tolist()))
+
+def to_file(wvls, R_f, T_f, R_r, T_r, R = None, T = None, filename=None, output_format = "txt"):
+    """
+    Write RTA spectra to a file.
+
+    Parameters
+    ----------
+    wvls, R_f, T_f, R_r, T_r: ndarray
+        The wavelengths and the forward/reverse spectra.
+    R, T: ndarray, optional
+        The spectra with backside. Written as zeros in the text and .npy formats if not given.
+    filename: str, optional
+        The output file (or directory for the columnar format). Defaults to "RTA" with
+        the extension of the output format.
+    output_format: str
+        - "txt": comma-separated text with seven columns, five decimals per value.
+        - "npy": a single (n, 7) float64 array with the same columns as the text format.
+        - "npz": an uncompressed archive with one named array per channel.
+        - "columns": a directory with one memory-mappable `<channel>.npy` file per channel.
+    """
+    if output_format not in RTA_EXTENSIONS:
+        raise ValueError(f"Unknown output format '{output_format}'.")
 
     if filename is None:
-        filename = "RTA.txt"
+        filename = "RTA" + RTA_EXTENSIONS[output_format]
 
-    if R is None and T is None:
-        elements_per_row = 5
-    else:
-        elements_per_row = 7
+    channels = {"wvls": wvls, "R_f": R_f, "T_f": T_f, "R_r": R_r, "T_r": T_r, "R": R, "T": T}
+    channels = {key: np.asarray(value, dtype=float).ravel() for key, value in channels.items() if value is not None}
+
+    match output_format:
+        case "npz":
+            np.savez(filename, **channels)
+            return
+        case "columns":
+            os.makedirs(filename, exist_ok=True)
+            for key, value in channels.items():
+                np.save(os.path.join(filename, key + ".npy"), value)
+            return
+
+    # Fill out missing spectra with zeros
+    zeros = np.zeros_like(channels["wvls"])
+    matrix = np.column_stack([channels.get(key, zeros) for key in RTA_CHANNELS])
+
+    if output_format == "npy":
+        np.save(filename, matrix)
+        return
 
     with open(filename, "w") as f:
-        # Loop through the arrays in steps of 7 elements to
-        # extract elements for the current row
-        for i in range(0, len(wvls), elements_per_row):
-            _wavelength = wvls[i:i + elements_per_row]
-            _R_f = R_f[i:i + elements_per_row]
-            _T_f = T_f[i:i + elements_per_row]
-            _R_r = R_r[i:i + elements_per_row]
-            _T_r = T_r[i:i + elements_per_row]
-            
-            # Fill out empty values with zeros if needed
-            if R is None:
-                _R = np.zeros(elements_per_row)
-            else:
-                _R = R[i:i + elements_per_row]
-            
-            if T is None:
-                _T = np.zeros(elements_per_row)
-            else:
-                _T = T[i:i + elements_per_row]
-
-            # Combine the rows into a formatted string
-            row = ""
-            for j in range(len(_wavelength)):
-                row = f"{_wavelength[j].item():.5f}, {_R_f[j].item():.5f}, {_T_f[j].item():.5f}, {_R_r[j].item():.5f}, {_T_r[j].item():.5f}, {_R[j].item():.5f}, {_T[j].item():.5f}\n"
-                f.write(row)
+        _write_rows(f, matrix)
 
-def csv2txt(inputf, outputf, headr = 2, interpolate = True, start_x = 250.0, stop_x = 1000.0, step = 1, transpose = True, save_to_file = True):
+def _write_nk(filename, x, n, k):
+    # Write n,k data in the material database format read by utils.read_mat_file
+    with open(filename, "w") as f:
+        f.write("wvls\t n\t k\n")
+        _write_rows(f, np.column_stack((x, n, k)), fmt=("%s", "%.5f", "%.5f"), delimiter="\t")
 
-    buffer = csv(file=inputf + ".csv", header=2)
+def _read_nk_csv(file, headr = 2, transpose = True):
+    buffer = np.loadtxt(file, delimiter=",", skiprows=headr, ndmin=2)
 
     if transpose is True:
         buffer = buffer.transpose()
 
+    return buffer
+
+def _resample_nk(buffer, x):
+    return np.interp(x=x, xp=buffer[0], fp=buffer[1]), np.interp(x=x, xp=buffer[0], fp=buffer[2])
+
+def csv2txt(inputf, outputf, headr = 2, interpolate = True, start_x = 250.0, stop_x = 1000.0, step = 1, transpose = True, save_to_file = True):
+
+    buffer = _read_nk_csv(inputf + ".csv", headr=headr, transpose=transpose)
+
     if interpolate is True:
         number_of_points = num_points(start=start_x, end=stop_x, step=step)
         x = np.linspace(start=start_x, stop=stop_x, num=number_of_points)
-        n = np.interp(x=x, xp=buffer[0], fp=buffer[1])
-        k = np.interp(x=x, xp=buffer[0], fp=buffer[2])
+        n, k = _resample_nk(buffer, x)
     else:
         x = buffer[0]
         n = buffer[1]
         k = buffer[2]
 
     if save_to_file is True:
-        output_file = output_file
-        with open(output_file, "w") as f:
-            f.write("wvls\t n\t k\n")
-            for wvl, n_i, k_i in zip(x, n, k):
-                f.write(f"{wvl}\t{n_i:.5f}\t{k_i:.5f}\n")
+        _write_nk(outputf, x, n, k)
+
+    return x, n, k
+
+def _convert_nk_csv(args):
+    file, output_file, x, headr, transpose = args
+    n, k = _resample_nk(_read_nk_csv(file, headr=headr, transpose=transpose), x)
+    _write_nk(output_file, x, n, k)
+
+    return n, k
+
+def csv2db(input_dir, start_x = 250.0, stop_x = 1000.0, step = 1, headr = 2, transpose = True, db_dir = None, processes = None, compile = False):
+    """
+    Convert a directory of vendor CSV n,k files into the material database format.
+
+    Every `<name>.csv` file is resampled onto the common grid [start_x, stop_x] and written
+    as `<name>_nk.txt` into the database directory, where utils.read_mat_file can find it.
+
+    Parameters
+    ----------
+    input_dir: str
+        Directory with the CSV files (columns: wavelength, n, k).
+    start_x, stop_x, step: float
+        The common wavelength grid.
+    headr: int
+        Number of header rows to skip in the CSV files.
+    transpose: bool
+        Must be True for column-oriented CSV files.
+    db_dir: str, optional
+        The output directory. Defaults to the material database of the package.
+    processes: int, optional
+        If given, the files are converted in a process pool with this many workers.
+    compile: bool
+        If set to True, the compiled material database is rebuilt afterwards.
+
+    Returns
+    -------
+    tuple
+        The common wavelength grid and a dictionary mapping material names to (n, k).
+    """
+    if db_dir is None:
+        db_dir = _get_db_dir()
+    os.makedirs(db_dir, exist_ok=True)
+
+    x = np.linspace(start=start_x, stop=stop_x, num=num_points(start=start_x, end=stop_x, step=step))
+
+    # Keep the file names as they are, the extension may be in any case (e.g. "SiO2.CSV")
+    files = sorted(name for name in os.listdir(input_dir) if name.lower().endswith(".csv"))
+    names = [os.path.splitext(file)[0] for file in files]
+    jobs = [(os.path.join(input_dir, file), os.path.join(db_dir, name + DISPERSION_SUFFIX + EXTENSION), x, headr, transpose)
+            for file, name in zip(files, names)]
+
+    if processes is None:
+        results = [_convert_nk_csv(job) for job in jobs]
+    else:
+        # Imported here to keep the package import light
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_convert_nk_csv, jobs))
+
+    if compile is True:
+        build_material_db(db_dir)
 
-    return x, n, k
\ No newline at end of file
+    return x, dict(zip(names, results))
@@ -0,0 +1,128 @@
+# This module records the progress of a sweep so that an interrupted sweep can be resumed
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from .api import _canonical
+
+def point_key(point):
+    """ Returns a stable hash of a sweep point, independent of the order of its parameters. """
+    canonical = json.dumps(_canonical(point), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class SweepJournal():
+    def __init__(self, path):
+        """
+        An append-only manifest of the completed points of a sweep.
+
+        Every completed point is written as one JSON line with its parameters and the location
+        of its result (e.g. a file name or a row of a SweepDataset). A restarted sweep reads the
+        journal and only runs the remaining points.
+
+        Parameters:
+        -----------
+        path : str
+            The journal file; created if it does not exist.
+
+        Notes:
+        ------
+        - Every entry is written with a single append and synced to disk before record() returns,
+          so a crash can at most leave a partial last line. Such a line is dropped when the
+          journal is opened again.
+        - The journal is safe to use from the worker threads of a SweepRunner.
+        """
+        self.path = os.path.abspath(path)
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._load()
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb") as f:
+            data = f.read()
+
+        # Drop a partial last line left by a crash, so that new entries start on a fresh line
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+
+        for line in data[:end].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self.entries[entry["key"]] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, point):
+        return point_key(point) in self.entries
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, point):
+        """ Returns the journal entry of a completed point, or None. """
+        return self.entries.get(point_key(point))
+
+    def remaining(self, points):
+        """ Returns the points that are not completed yet, in their original order. """
+        return [point for point in points if point not in self]
+
+    def record(self, point, location = None, **info):
+        """
+        Records a completed point.
+
+        Parameters:
+        -----------
+        point : dict
+            The sweep point.
+
+        location : optional
+            Where the result of the point is stored; must be JSON-serializable.
+
+        **info :
+            Extra JSON-serializable fields of the entry, e.g. the run time.
+        """
+        entry = {"key": point_key(point), "point": _canonical(point), "location": _canonical(location)}
+        entry.update(_canonical(info))
+        line = (json.dumps(entry, separators=(",", ":")) + "\n").encode()
+
+        with self._lock:
+            os.write(self._fd, line)
+            os.fsync(self._fd)
+            self.entries[entry["key"]] = entry
+
+    def compact(self):
+        """ Rewrites the journal with one line per completed point, replacing the file atomically. """
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            fd, temporary = tempfile.mkstemp(dir=directory, prefix=".journal_")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    for entry in self.entries.values():
+                        f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temporary, self.path)
+            except BaseException:
+                os.remove(temporary)
+                raise
+
+            os.close(self._fd)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
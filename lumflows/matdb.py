@@ -0,0 +1,84 @@
+# This module compiles the text material database into a binary, memory-mappable form
+#
+# Usage:
+#     python -m lumflows.matdb [db_dir]
+
+import os
+import sys
+import json
+import uuid
+import numpy as np
+from .utils import (DISPERSION_SUFFIX, EXTENSION, COMPILED_DATA_PREFIX, COMPILED_INDEX, COMPILED_VERSION,
+                    _get_db_dir, _load_mat_file, clear_material_cache)
+
+def _atomic_write(path, write):
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        write(f)
+    os.replace(tmp, path)
+
+def build_material_db(db_dir = None):
+    """
+    Compile all `<name>_nk.txt` files of the material database into a single binary bundle.
+
+    The bundle consists of a (3, N) float64 `materials-<build id>.npy` array holding the
+    concatenated wavelength, n and k columns of all materials, and a JSON index naming that
+    array, with the offset, length and source modification time of every material.
+
+    Every build writes a new data file and then replaces the index, so readers always pair an
+    index with the data it was built with. The data files of previous builds are removed.
+
+    Parameters
+    ----------
+    db_dir: str, optional
+        The database directory. Defaults to the `db` directory of the package.
+
+    Returns
+    -------
+    dict
+        The index of the compiled database.
+    """
+    if db_dir is None:
+        db_dir = _get_db_dir()
+
+    suffix = DISPERSION_SUFFIX + EXTENSION
+    sources = sorted(name for name in os.listdir(db_dir) if name.endswith(suffix))
+
+    blocks, materials, offset = [], {}, 0
+    for source in sources:
+        file = os.path.join(db_dir, source)
+        data = np.atleast_2d(_load_mat_file(file))
+        if data.shape[0] != 3:
+            raise RuntimeError(f"File '{source}' must contain exactly three columns: wavelength, n and k.")
+
+        blocks.append(data)
+        materials[source[:-len(suffix)]] = {"offset": offset, "length": data.shape[1],
+                                            "mtime_ns": os.stat(file).st_mtime_ns}
+        offset += data.shape[1]
+
+    bundle = np.ascontiguousarray(np.concatenate(blocks, axis=1) if blocks else np.zeros((3, 0)), dtype=np.float64)
+    build_id = uuid.uuid4().hex
+    data_file = COMPILED_DATA_PREFIX + build_id + ".npy"
+    index = {"version": COMPILED_VERSION, "build_id": build_id, "data": data_file, "size": bundle.shape[1],
+             "materials": materials}
+
+    # Write the data first, so that a present index always points to a complete bundle
+    _atomic_write(os.path.join(db_dir, data_file), lambda f: np.save(f, bundle))
+    _atomic_write(os.path.join(db_dir, COMPILED_INDEX), lambda f: f.write(json.dumps(index, indent=1).encode()))
+
+    # Remove the data of previous builds (and of the unversioned layout); processes that
+    # already mapped one keep their view. Files still in use on Windows are left for the next build.
+    for name in os.listdir(db_dir):
+        if name.endswith(".npy") and name.startswith(COMPILED_DATA_PREFIX[:-1]) and name != data_file:
+            try:
+                os.remove(os.path.join(db_dir, name))
+            except OSError:
+                pass
+
+    clear_material_cache()
+
+    return index
+
+if __name__ == "__main__":
+    index = build_material_db(*sys.argv[1:2])
+    print(f"Compiled {len(index['materials'])} materials: {', '.join(index['materials'])}")
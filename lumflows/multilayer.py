@@ -0,0 +1,91 @@
+# This module chains thick (incoherent) layers and interface spectra into the R and T of a whole sample
+
+import numpy as np
+from .utils import compute_absoprtion_term
+
+def fresnel_interface(N_1, N_2):
+    """
+    Normal-incidence spectra of a bare interface between two media.
+
+    Parameters
+    ----------
+    N_1, N_2: complex or ndarray
+        Complex refractive indices of the media before and after the interface.
+
+    Returns
+    -------
+    tuple
+        (R_f, T_f, R_r, T_r) of the interface. Bare interfaces are symmetric.
+    """
+    r = np.abs((N_1 - N_2) / (N_1 + N_2))
+    R = r * r
+    T = 1.0 - R
+
+    return R, T, R, T
+
+def layer_attenuation(wvls, N, thickness, theta = 0.0, n_medium = 1.0003):
+    """ Single-pass intensity attenuation exp(2*beta) of a thick layer, along the path refracted from `theta` in the incidence medium. """
+    return np.exp(2.0 * compute_absoprtion_term(wvls, N, theta=theta, thickness=thickness, n_medium=n_medium))
+
+def _combine(interface, attenuation, rest):
+    # Cascade an interface and a thick layer in front of the rest of the stack. This is the
+    # product of the intensity transfer matrices written in scattering form, which stays
+    # finite for opaque layers (attenuation -> 0) and opaque interfaces (T -> 0).
+    R_f, T_f, R_r, T_r = interface
+    R_rest, T_rest, R_rest_r, T_rest_r = rest
+
+    a2 = attenuation * attenuation
+    loss = 1.0 - R_r * a2 * R_rest
+
+    R = R_f + T_f * T_r * a2 * R_rest / loss
+    T = T_f * attenuation * T_rest / loss
+    R_reverse = R_rest_r + T_rest * T_rest_r * a2 * R_r / loss
+    T_reverse = T_rest_r * attenuation * T_r / loss
+
+    return R, T, R_reverse, T_reverse
+
+def incoherent_stack(wvls, interfaces, layers, theta = 0.0, n_medium = 1.0003):
+    """
+    Compute R and T of a stack of thick layers separated by (coated or bare) interfaces.
+
+    Light is summed incoherently inside the thick layers; the interfaces may carry any
+    coating whose spectra come e.g. from FDTD simulations. All wavelengths (and any
+    broadcast leading axes) are computed at once.
+
+    Parameters
+    ----------
+    wvls: ndarray
+        The wavelength grid.
+    interfaces: list of tuple
+        (R_f, T_f, R_r, T_r) spectra of every interface, from the front to the back of the
+        sample, where "f" is incidence from the front side. There must be one more interface
+        than layers. See fresnel_interface() for uncoated interfaces.
+    layers: list of tuple
+        (N, thickness) of every thick layer, in the units of the wavelength grid.
+    theta: float or ndarray
+        Angle of incidence in degrees in the incidence medium. The light is refracted into
+        every layer, see utils.compute_absoprtion_term(). The interface spectra must be
+        given at this angle; fresnel_interface() is valid at normal incidence only.
+    n_medium: float
+        Refractive index of the incidence medium.
+
+    Returns
+    -------
+    tuple
+        R and T of the stack for incidence from the front, and R and T for incidence from the back.
+
+    Example:
+        A substrate coated on both sides:
+            incoherent_stack(wvls, [front_coating, back_coating], [(N_substrate, 2e6)])
+    """
+    if len(interfaces) != len(layers) + 1:
+        raise RuntimeError("The stack must have exactly one more interface than thick layers.")
+
+    interfaces = [tuple(np.asarray(spectrum, dtype=float) for spectrum in interface) for interface in interfaces]
+
+    # Start from the last interface and add layers towards the front
+    stack = interfaces[-1]
+    for interface, (N, thickness) in zip(reversed(interfaces[:-1]), reversed(layers)):
+        stack = _combine(interface, layer_attenuation(wvls, N, thickness, theta=theta, n_medium=n_medium), stack)
+
+    return stack
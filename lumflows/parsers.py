@@ -1,7 +1,166 @@
+import re
 import numpy as np
-from .utils import normalize
+from .utils import normalize as _normalize
 
-def map(map, absolute_values=True, normalize=True, reverse_order=True, axis=1, mode='R'):
+_RTA_LABEL = re.compile(r"\b([RTA])\b")
+# Newlines followed by an empty line
+_RTA_BLANK = re.compile(r"\n(?=[ \t\r]*\n)")
+
+class LazyMap():
+    def __init__(self, x, y, z, absolute_values = True, normalize = True, reverse_order = True, axis = 1, mode = 'R', chunk_size = None):
+        """
+        A view-like wrapper around the z dataset of an angle sweep map.
+
+        Hyperslabs are read from the dataset on demand and the abs/normalize/flip/R->A
+        transforms are applied to each block, so the full map is never materialized unless
+        requested. See map() for the meaning of the transform arguments.
+
+        Parameters
+        ----------
+        x, y: ndarray
+            Coordinates of the map. They are small and kept in memory.
+        z: Dataset
+            The hdf5 dataset (or any array supporting slicing) holding the map.
+        chunk_size: int, optional
+            Number of rows along the first axis processed at once when the whole dataset
+            must be scanned (e.g. for the normalization extrema). Defaults to the dataset
+            chunking or to blocks of about 16 MiB.
+        """
+        if mode not in ('R', 'A'):
+            raise ValueError(f"Unknown representation mode '{mode}'.")
+
+        self.x, self.y, self.z = x, y, z
+        self.absolute_values = absolute_values
+        self.normalize = normalize
+        self.flip_axes = (axis % len(z.shape),) if reverse_order else ()
+        self.mode = mode
+        self.shape = tuple(z.shape)
+        self.ndim = len(self.shape)
+
+        if chunk_size is None:
+            chunks = getattr(z, "chunks", None)
+            row_bytes = max(1, int(np.prod(self.shape[1:])) * np.dtype(z.dtype).itemsize)
+            chunk_size = chunks[0] if chunks else max(1, (1 << 24) // row_bytes)
+        self.chunk_size = chunk_size
+
+        # x runs along the first axis unless only the second axis matches its length
+        self.x_axis = 0 if self.shape[0] == np.size(x) or self.shape[-1] != np.size(x) else self.ndim - 1
+        self.y_axis = self.ndim - 1 - self.x_axis
+
+        self._extrema = None
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __array__(self, dtype = None, copy = None):
+        data = self[...]
+        return data if dtype is None else data.astype(dtype)
+
+    def _read(self, key):
+        # Translate the key from the output (flipped) index space into a bounding hyperslab
+        # of the dataset, read it and reorder the elements locally
+        if key is Ellipsis:
+            key = ()
+        if not isinstance(key, tuple):
+            key = (key,)
+        key = key + (slice(None),) * (self.ndim - len(key))
+
+        hyperslab, local = [], []
+        for dim, (n, k) in enumerate(zip(self.shape, key)):
+            indices = np.arange(n)[k]
+            if dim in self.flip_axes:
+                indices = n - 1 - indices
+
+            if np.size(indices) == 0:
+                hyperslab.append(slice(0, 0))
+                local.append(slice(None))
+                continue
+
+            start = int(np.min(indices))
+            hyperslab.append(slice(start, int(np.max(indices)) + 1))
+            local.append(indices - start)
+
+        block = np.asarray(self.z[tuple(hyperslab)])
+
+        # Apply the local reordering axis by axis; scalar indices drop their axis
+        for dim in reversed(range(self.ndim)):
+            block = np.take(block, local[dim], axis=dim) if not isinstance(local[dim], slice) else block
+
+        return block
+
+    def _transform(self, block):
+        if self.absolute_values is True:
+            block = np.absolute(block)
+
+        if self.normalize is True:
+            z_min, z_max = self.extrema()
+            block = (block - z_min) / (z_max - z_min)
+
+        if self.mode == 'A':
+            block = 1 - block
+
+        return block
+
+    def __getitem__(self, key):
+        return self._transform(self._read(key))
+
+    def extrema(self):
+        """ Returns the (min, max) of the (absolute) data, computed once in a chunked pass. """
+        if self._extrema is None:
+            z_min, z_max = np.inf, -np.inf
+            for start in range(0, self.shape[0], self.chunk_size):
+                block = np.asarray(self.z[start:start + self.chunk_size])
+                if self.absolute_values is True:
+                    block = np.absolute(block)
+                z_min, z_max = min(z_min, np.min(block)), max(z_max, np.max(block))
+
+            self._extrema = (z_min, z_max)
+
+        return self._extrema
+
+    def iter_chunks(self, chunk_size = None):
+        """
+        Iterates over the transformed map in blocks along the first axis.
+
+        Yields
+        ------
+        tuple
+            The slice of the first axis and the corresponding block of data.
+        """
+        chunk_size = self.chunk_size if chunk_size is None else chunk_size
+        for start in range(0, self.shape[0], chunk_size):
+            rows = slice(start, min(start + chunk_size, self.shape[0]))
+            yield rows, self[rows]
+
+    def select(self, x_range = None, y_range = None):
+        """
+        Reads the part of the map within the given coordinate ranges.
+
+        Parameters
+        ----------
+        x_range, y_range: tuple, optional
+            (min, max) coordinate values (inclusive), e.g. an angle or a wavelength range.
+
+        Returns
+        -------
+        ndarray
+            x, y and z components within the ranges.
+        """
+        key = [slice(None)] * self.ndim
+        coordinates = {"x": np.ravel(self.x), "y": np.ravel(self.y)}
+
+        for name, dim, bounds in (("x", self.x_axis, x_range), ("y", self.y_axis, y_range)):
+            if bounds is None:
+                continue
+            values = coordinates[name]
+            selected = np.flatnonzero((values >= bounds[0]) & (values <= bounds[1]))
+            key[dim] = slice(selected[0], selected[-1] + 1) if selected.size else slice(0, 0)
+            coordinates[name] = values[key[dim]]
+
+        x, y = coordinates["x"], coordinates["y"]
+        return x, y, self[tuple(key)]
+
+def map(map, absolute_values=True, normalize=True, reverse_order=True, axis=1, mode='R', lazy=False, chunk_size=None):
     """
     Parse a .mat file generated by angle sweep script in Lumerical into x, y and z components.
 
@@ -19,6 +178,11 @@ def map(map, absolute_values=True, normalize=True, reverse_order=True, axis=1, m
         The axis along wich the z component is reversed.
     mode: str
         Toggles the data representation mode between reflection and absorption. Note: T is ignored.
+    lazy: bool
+        If set to True, z is returned as a LazyMap that reads and transforms the data on demand.
+        The file must stay open while the LazyMap is used.
+    chunk_size: int, optional
+        Block size along the first axis used by the LazyMap, see LazyMap.
 
     Returns
     -------
@@ -28,11 +192,19 @@ def map(map, absolute_values=True, normalize=True, reverse_order=True, axis=1, m
     
     x, y, z = map.get('lum/x'), map.get('lum/y'), map.get('lum/z')
 
+    if lazy is True:
+        if mode not in ('R', 'A'):
+            return -1
+        return np.array(x), np.array(y), LazyMap(np.array(x), np.array(y), z, absolute_values=absolute_values, normalize=normalize,
+                                                 reverse_order=reverse_order, axis=axis, mode=mode, chunk_size=chunk_size)
+
+    z = np.array(z)
+
     if absolute_values is True:
         z = np.absolute(z)
 
     if normalize is True:
-        z = normalize(z)
+        z = _normalize(z)
 
     if reverse_order is True:
         z = np.flip(z, axis)
@@ -47,45 +219,123 @@ def map(map, absolute_values=True, normalize=True, reverse_order=True, axis=1, m
 
     return np.array(x), np.array(y), z
 
-def single_rta(file):
-    # Initialize empty lists to store wavelength and spectral data
-    wavelength_R, data_R = [], []
-    wavelength_T, data_T = [], []
-    wavelength_A, data_A = [], []
-
-    # Track which data type we are currently processing
-    current_data = None
-
-    # Open and read the file
-    with open(file, "r") as file:
-        for line in file:
-            # Ignore empty lines
-            if line.strip() == "":
-                current_data = None  # Reset data type on empty lines
-                continue
-            
-            # Check for the header line and assign current_data
-            if "wavelength" in line:
-                if "R" in line:
-                    current_data = (wavelength_R, data_R)
-                elif "T" in line:
-                    current_data = (wavelength_T, data_T)
-                elif "A" in line:
-                    current_data = (wavelength_A, data_A)
-                continue
-            
-            # Parse data lines
-            if current_data is not None:
-                values = line.strip().split(",")
-                wavelength_value, data_value = float(values[0]), float(values[1])
-
-                # Append to current data arrays
-                current_data[0].append(wavelength_value)
-                current_data[1].append(data_value)
-
-    # Convert lists to numpy arrays and stack to create 2xn arrays
-    R = np.array([wavelength_R, data_R])
-    T = np.array([wavelength_T, data_T])
-    A = np.array([wavelength_A, data_A])
-
-    return R, T, A
\ No newline at end of file
+def _section_label(header):
+    # Match the data label as a standalone token (e.g. "R" or "T (a.u.)"), not as a substring of other text
+    for token in header.split(",")[1:]:
+        match = _RTA_LABEL.search(token)
+        if match is not None:
+            return match.group(1)
+
+    return None
+
+def _parse_block(text):
+    # Bulk-convert a block of "x, y[, ...]" lines into an (n, 2) array
+    columns = text[:text.index("\n")].count(",") + 1
+    values = np.fromstring(text.rstrip().replace("\n", ","), sep=",")
+
+    return values.reshape(-1, columns)[:, :2]
+
+def _find_boundaries(text):
+    # Return the sorted (start, end, header) spans of header lines and empty lines in a
+    # newline-terminated text; header is None for empty lines. Plain substring search and a
+    # literal-anchored pattern keep the scan at C speed.
+    spans = []
+
+    i = text.find("wavelength")
+    while i != -1:
+        start = text.rfind("\n", 0, i) + 1
+        end = text.index("\n", i) + 1
+        spans.append((start, end, text[start:end]))
+        i = text.find("wavelength", end)
+
+    # Prepend a newline so that an empty first line is found as well
+    for match in _RTA_BLANK.finditer("\n" + text):
+        start = match.start()
+        spans.append((start, text.index("\n", start) + 1, None))
+
+    spans.sort()
+    return spans
+
+def iter_rta_sections(file, chunk_size = 1 << 24):
+    """
+    Parse a Lumerical RTA text export section by section.
+
+    The file is read in chunks; section boundaries (headers and empty lines) are located
+    once per chunk and the numeric text in between is converted in bulk.
+
+    Parameters
+    ----------
+    file: str
+        Path to the text file.
+    chunk_size: int
+        Number of characters read at once. Bounds the memory used for the raw text.
+
+    Yields
+    ------
+    tuple
+        The section label ("R", "T" or "A") and a 2xn array of wavelengths and data.
+        Sections with an unrecognized header are skipped.
+    """
+    label, blocks = None, []
+
+    def _flush():
+        data = np.concatenate(blocks) if blocks else np.empty((0, 2))
+        blocks.clear()
+        return label, data.transpose()
+
+    with open(file, "r") as f:
+        tail = ""
+        while True:
+            chunk = f.read(chunk_size)
+            text = tail + chunk
+            if not chunk:
+                # Make sure the last line is terminated
+                text = text + "\n" if text and not text.endswith("\n") else text
+                cut = len(text)
+            else:
+                cut = text.rfind("\n") + 1
+            text, tail = text[:cut], text[cut:]
+
+            position = 0
+            for start, end, header in _find_boundaries(text):
+                if label is not None and start > position:
+                    blocks.append(_parse_block(text[position:start]))
+
+                # Empty lines terminate the current section, header lines start a new one
+                if label is not None:
+                    yield _flush()
+                label = _section_label(header) if header is not None else None
+                position = end
+
+            if label is not None and position < len(text):
+                blocks.append(_parse_block(text[position:]))
+
+            if not chunk:
+                break
+
+    if label is not None:
+        yield _flush()
+
+def single_rta(file, chunk_size = 1 << 24):
+    """
+    Parse a Lumerical RTA text export into R, T and A arrays.
+
+    Parameters
+    ----------
+    file: str
+        Path to the text file.
+    chunk_size: int
+        Number of characters read at once, see iter_rta_sections().
+
+    Returns
+    -------
+    ndarray
+        R, T and A as 2xn arrays of wavelengths and data. Missing sections are returned empty.
+    """
+    sections = {"R": [], "T": [], "A": []}
+    for label, data in iter_rta_sections(file, chunk_size=chunk_size):
+        sections[label].append(data)
+
+    R, T, A = (np.concatenate(sections[label], axis=1) if sections[label] else np.array([[], []]) for label in "RTA")
+
+    return R, T, A
@@ -0,0 +1,91 @@
+# This module selects non-uniform wavelength grids that resolve spectral features with fewer points
+
+import numpy as np
+
+def resample(wvls, spectra, new_wvls):
+    """
+    Linearly interpolate (stacks of) spectra onto a new, possibly non-uniform, wavelength grid.
+
+    Parameters
+    ----------
+    wvls: ndarray
+        The increasing wavelength grid of the spectra, shape (n_wvl,).
+    spectra: ndarray
+        Spectra of shape (..., n_wvl).
+    new_wvls: ndarray
+        The new wavelength grid within the range of `wvls`.
+
+    Returns
+    -------
+    ndarray
+        The spectra on the new grid, shape (..., len(new_wvls)).
+    """
+    wvls = np.asarray(wvls, dtype=float)
+    new_wvls = np.asarray(new_wvls, dtype=float)
+    spectra = np.asarray(spectra)
+
+    # The interpolation weights are shared by all spectra of the stack
+    right = np.clip(np.searchsorted(wvls, new_wvls, side="right"), 1, len(wvls) - 1)
+    left = right - 1
+    t = np.clip((new_wvls - wvls[left]) / (wvls[right] - wvls[left]), 0.0, 1.0)
+
+    return spectra[..., left] * (1.0 - t) + spectra[..., right] * t
+
+def adaptive_grid(wvls, *spectra, tol = 1e-3, min_points = 16, max_points = None):
+    """
+    Select a non-uniform subset of a dense wavelength grid that represents the spectra within `tol`.
+
+    Starting from a coarse uniform subset, every interval whose linear interpolation deviates
+    from any of the spectra by more than `tol` is split at its worst point. Points therefore
+    accumulate where the curvature is high (e.g. interference fringes), while flat regions
+    keep only a few points.
+
+    Parameters
+    ----------
+    wvls: ndarray
+        The dense, increasing wavelength grid, shape (n_wvl,).
+    *spectra: ndarray
+        One or more (stacks of) spectra of shape (..., n_wvl) sampled on `wvls`.
+    tol: float
+        The maximum absolute interpolation error.
+    min_points: int
+        Number of points of the initial uniform subset.
+    max_points: int, optional
+        Upper bound of the number of points. The refinement stops once it is reached.
+
+    Returns
+    -------
+    ndarray
+        The sorted indices of the selected points in `wvls`. Use wvls[indices] as the new grid,
+        and resample() or indexing to bring other data onto it.
+    """
+    wvls = np.asarray(wvls, dtype=float)
+    n = len(wvls)
+    if n <= 2:
+        return np.arange(n)
+
+    data = np.concatenate([np.asarray(spectrum, dtype=float).reshape(-1, n) for spectrum in spectra])
+    max_points = n if max_points is None else min(max_points, n)
+
+    selected = np.unique(np.linspace(0, n - 1, min(max(min_points, 2), n)).round().astype(int))
+
+    while len(selected) < max_points:
+        error = np.max(np.abs(resample(wvls[selected], data[:, selected], wvls) - data), axis=0)
+
+        # Worst point of every interval [selected[i], selected[i + 1])
+        worst = np.maximum.reduceat(error, selected[:-1])
+        offsets = [np.argmax(error[start:stop]) for start, stop in zip(selected[:-1], selected[1:])]
+        candidates = selected[:-1] + np.asarray(offsets)
+        candidates = candidates[(worst > tol) & (candidates > selected[:-1])]
+
+        if candidates.size == 0:
+            break
+
+        # Refine the worst intervals first if the budget is limited
+        budget = max_points - len(selected)
+        if candidates.size > budget:
+            candidates = candidates[np.argsort(error[candidates])[::-1][:budget]]
+
+        selected = np.union1d(selected, candidates)
+
+    return selected
@@ -1,64 +1,139 @@
-# This module handles session management 
+# This module handles session management
 
-from pathlib import WindowsPath
+from pathlib import Path
+import importlib
 import os
 import re
 import sys
+import threading
 
-class MyPath(WindowsPath):
+# Directory containing lumapi.py; skips the discovery if set
+LUMERICAL_API_ENV = "LUMERICAL_API_PATH"
+
+# Installation roots scanned for vXXX subdirectories
+DEFAULT_ENDPOINTS = {"nt": ["C:\\Program Files\\Lumerical"],
+                     "posix": ["/opt/lumerical"]}
+
+# The lumapi module is imported once per process
+_lumapi = None
+_lumapi_lock = threading.Lock()
+
+class MyPath(type(Path())):
     def as_str(self):
         """ Returns the path converted to a string. """
         return str(self)
 
+def _get_cache_file():
+    if os.name == "nt":
+        root = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        root = os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache"))
+
+    return os.path.join(root, "lumflows", "lumapi_path")
+
+def _is_api_dir(path):
+    return path is not None and os.path.isfile(os.path.join(path, "lumapi.py"))
+
 class Connector():
-    def __init__(self, endpoint = "C:\\Program Files\\Lumerical"):
-        """ Detect the available version and initialize the Lumerical API. """
+    def __init__(self, endpoint = None):
+        """
+        Locates the Lumerical Python API and imports it.
 
-        self.endpoint = MyPath(endpoint)
+        The API directory is resolved in the following order:
+        1. The LUMERICAL_API_PATH environment variable.
+        2. The path resolved by a previous discovery, cached in a small file in the user cache directory.
+        3. The latest vXXX installation under `endpoint` (by default "C:\\Program Files\\Lumerical"
+           on Windows and "/opt/lumerical" on Linux).
+        """
+        self.endpoints = [MyPath(endpoint)] if endpoint is not None else [MyPath(path) for path in DEFAULT_ENDPOINTS.get(os.name, [])]
         self.version_subdir_pattern = re.compile(r"^v(\d{3})$")
-        
-        self.api_version = self._get_api_version()
-        if self.api_version is None:
-            raise FileNotFoundError("Unable to detect Lumerical API on the system!")
 
-        # Update the endpoint to include the detected API version
-        self.endpoint = self.endpoint / self.api_version / "api" / "python"
+        self.api_version = None
+        self.endpoint = None
+
+    def resolve(self):
+        """ Returns the directory containing lumapi.py. """
+        path = os.environ.get(LUMERICAL_API_ENV)
+        if path:
+            if not _is_api_dir(path):
+                raise FileNotFoundError(f"'{path}' set in {LUMERICAL_API_ENV} does not contain lumapi.py!")
+            self.endpoint = MyPath(path)
+            return self.endpoint.as_str()
+
+        cached = self._read_cache()
+        if _is_api_dir(cached) and any(MyPath(cached).is_relative_to(endpoint) for endpoint in self.endpoints):
+            self.endpoint = MyPath(cached)
+            return self.endpoint.as_str()
+
+        for endpoint in self.endpoints:
+            self.api_version = self._get_api_version(endpoint)
+            if self.api_version is not None:
+                # Update the endpoint to include the detected API version
+                self.endpoint = endpoint / self.api_version / "api" / "python"
+                self._write_cache(self.endpoint.as_str())
+                return self.endpoint.as_str()
+
+        raise FileNotFoundError("Unable to detect Lumerical API on the system!")
 
     def connect(self):
-        print(f"Detected Lumerical API version: {self.api_version}. Conecting...")
-        paths = [self.endpoint.as_str(), os.path.dirname(__file__)]
-        for path in paths:
-            if path not in sys.path:
-                sys.path.append(path)
+        """ Imports lumapi (once per process) and returns the module. """
+        global _lumapi
+
+        with _lumapi_lock:
+            if _lumapi is not None:
+                return _lumapi
+
+            # An already imported (e.g. stub) lumapi module is used as is
+            if "lumapi" not in sys.modules:
+                path = self.resolve()
+                print(f"Detected Lumerical API in {path}. Conecting...")
+                for path in [path, os.path.dirname(__file__)]:
+                    if path not in sys.path:
+                        sys.path.append(path)
 
-            import lumapi  # type: ignore
+            _lumapi = importlib.import_module("lumapi")
             print("Conected.")
-            return lumapi
+            return _lumapi
 
-    def _get_api_version(self):
+    @staticmethod
+    def _read_cache():
+        try:
+            with open(_get_cache_file(), "r") as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    @staticmethod
+    def _write_cache(path):
+        # The cache is only an optimization, failing to write it is not an error
+        try:
+            file = _get_cache_file()
+            os.makedirs(os.path.dirname(file), exist_ok=True)
+            tmp = f"{file}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                f.write(path)
+            os.replace(tmp, file)
+        except OSError:
+            pass
+
+    def _get_api_version(self, endpoint):
         """ Retrieve the latest available API version. """
         versions_available = []
 
         try:
             # List all subdirectories in the endpoint
-            subdirs = [MyPath(self.endpoint / subdir) for subdir in os.listdir(self.endpoint)]
+            subdirs = [MyPath(endpoint / subdir) for subdir in os.listdir(endpoint)]
 
             for subdir in subdirs:
                 match = self.version_subdir_pattern.match(subdir.name)
-                if match and subdir.is_dir():
+                if match and subdir.is_dir() and _is_api_dir(subdir / "api" / "python"):
                     versions_available.append(int(match.group(1)))
 
             if versions_available:
                 latest = max(versions_available)
                 return f"v{latest:03d}"
             else:
-                print("No API subdirectories found!")
                 return None
 
         except FileNotFoundError:
-            print(f"The directory '{self.endpoint.as_str()}' does not exist.")
             return None
-
-        except Exception as e:
-            print(f"An unexpected error occurred: {e}")
-            return None
\ No newline at end of file
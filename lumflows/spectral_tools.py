@@ -4,26 +4,178 @@ from .constants import speed_of_light
 def freq_to_wavelength(f):
     return np.array((speed_of_light / f) * 1e9).flatten()
 
-def compute_with_backside(wvls, R_front, T_front, R_front_reverse, T_front_reverse, substrate_name = "B270", N_substrate = None):
+def _prepare_substrate_constants(wvls, substrate_name, N_substrate):
+    if N_substrate is None:
+        return get_substrate_constants(substrate_name, wvls)
+
+    if len(wvls) != len(N_substrate):
+        raise RuntimeError("Lengths of wavelengths and complex index refraction values must be the same.")
+
+    if not np.issubdtype(N_substrate.dtype, np.complexfloating):
+        raise TypeError("Refractive index of the substrate must be in the complex form.")
+
+    return N_substrate
 
+def compute_with_backside(wvls, R_front, T_front, R_front_reverse, T_front_reverse, substrate_name = "B270", N_substrate = None, theta = 0.0, thickness = 2000000.0, polarization = UNPOLARIZED, n_medium = 1.0003):
+    """
+    Apply the backside correction of an uncoated substrate to the front side spectra.
+
+    Parameters
+    ----------
+    theta: float or ndarray
+        Angle(s) of incidence in degrees, in the ambient medium. An array of shape (n_angles,)
+        is matched with the axis preceding the wavelength axis of the spectra, e.g. spectra of
+        shape (n_angles, n_wvl); the wavelength axis is added here, do not add it yourself.
+
+    The other parameters are those of compute_with_backside_batch().
+
+    Notes
+    -----
+    The backside interface always uses the Fresnel reflectance of the complex substrate index.
+    At normal incidence, where the s and p reflectances coincide, it is computed directly;
+    at oblique incidence the correction is delegated to compute_angle_resolved_with_backside().
+    Both give the same result as theta goes to zero.
+    """
     # Prepare the substrate optical constants
-    if N_substrate is None:
-        N_substrate = interpolate_substrate_constants(read_mat_file(substrate_name), wvls)
-    else:
-        if len(wvls) != len(N_substrate):
-            raise RuntimeError("Lengths of wavelengths and complex index refraction values must be the same.")
+    N_substrate = _prepare_substrate_constants(wvls, substrate_name, N_substrate)
 
-        if not np.issubdtype(N_substrate.dtype, np.complexfloating):
-            raise TypeError("Refractive index of the substrate must be in the complex form.")
-    
-    # Compute the substrate spectra (R_backside, T_backside)
-    R_back, T_back = compute_substrate_spectra(wvls, N_substrate)
+    # At oblique incidence the backside reflectance and the absorption path depend on the angle
+    if np.any(np.asarray(theta) != 0.0):
+        return compute_angle_resolved_with_backside(wvls, R_front, T_front, R_front_reverse, T_front_reverse, theta,
+                                                    polarization=polarization, N_substrate=N_substrate,
+                                                    thickness=thickness, n_medium=n_medium)
+
+    # Compute the backside reflectance and transmittance, the same model as at oblique incidence
+    R_back = compute_backside_fresnel(N_substrate, n_medium=n_medium)
+    T_back = 1.0 - R_back
 
     # Compute absoprtion term
-    beta = compute_absoprtion_term(wvls, N_substrate)
+    beta = compute_absoprtion_term(wvls, N_substrate, thickness=thickness)
 
     # Compute corrected R and T spectra
     R = compute_R_with_backside(wvls, R_front, T_front, R_front_reverse, T_front_reverse, R_back, beta)
     T = compute_T_with_backside(wvls, T_front, R_front_reverse, T_back, R_back, beta)
 
-    return R, T
\ No newline at end of file
+    return R, T
+
+def compute_with_backside_batch(wvls, R_front, T_front, R_front_reverse, T_front_reverse, substrate_name = "B270", N_substrate = None, theta = 0.0, thickness = 2000000.0, polarization = UNPOLARIZED, n_medium = 1.0003):
+    """
+    Apply the backside correction to a stack of spectra in a single array operation.
+
+    Parameters
+    ----------
+    wvls: ndarray
+        Wavelength grid of shape (n_wvl,) shared by all spectra.
+    R_front, T_front, R_front_reverse, T_front_reverse: ndarray
+        Spectra of shape (..., n_wvl), e.g. (n_runs, n_angles, n_wvl) for a sweep.
+        The leading axes are broadcast against each other.
+    substrate_name: str
+        Name of the substrate in the material database. Ignored if N_substrate is given.
+    N_substrate: ndarray, optional
+        Complex refractive index of the substrate on the wavelength grid.
+    theta: float or ndarray
+        Angle(s) of incidence in degrees. An array of shape (n_angles,) is matched with
+        the axis preceding the wavelength axis of the spectra; the wavelength axis is added here.
+    thickness: float
+        Substrate thickness, in the units of the wavelength grid.
+    polarization: int
+        P_POLARIZED, S_POLARIZED or UNPOLARIZED; only used at oblique incidence.
+    n_medium: float
+        Refractive index of the ambient medium.
+
+    Returns
+    -------
+    ndarray
+        R and T spectra with the broadcast shape of the inputs.
+
+    Notes
+    -----
+    The substrate terms (N_substrate, R_back, beta) are computed once per (angle, wavelength)
+    and reused for every run in the batch. The model is that of compute_with_backside(): as
+    soon as an angle is non-zero, the correction is delegated to compute_angle_resolved_with_backside(),
+    which resolves the backside reflectance and the absorption along the refracted path per angle.
+    """
+    wvls = np.asarray(wvls, dtype=float)
+    N_substrate = _prepare_substrate_constants(wvls, substrate_name, N_substrate)
+
+    theta = np.asarray(theta, dtype=float)
+    if np.any(theta != 0.0):
+        return compute_angle_resolved_with_backside(wvls, R_front, T_front, R_front_reverse, T_front_reverse, theta,
+                                                    polarization=polarization, N_substrate=N_substrate,
+                                                    thickness=thickness, n_medium=n_medium)
+
+    # Substrate terms depend on wavelength only
+    R_back = compute_backside_fresnel(N_substrate, n_medium=n_medium)
+    T_back = 1.0 - R_back
+    beta = compute_absoprtion_term(wvls, N_substrate, thickness=thickness)
+
+    R = compute_R_with_backside(wvls, R_front, T_front, R_front_reverse, T_front_reverse, R_back, beta)
+    T = compute_T_with_backside(wvls, T_front, R_front_reverse, T_back, R_back, beta)
+
+    return R, T
+
+
+def compute_angle_resolved_with_backside(wvls, R_front, T_front, R_front_reverse, T_front_reverse, theta, polarization = UNPOLARIZED, substrate_name = "B270", N_substrate = None, thickness = 2000000.0, n_medium = 1.0003, front_p = None):
+    """
+    Apply the backside correction to an (angle x wavelength) map in a single call.
+
+    Unlike compute_with_backside(), the backside interface uses the oblique-incidence Fresnel
+    reflectance of the complex substrate index, and the absorption term accounts for the
+    refraction into the substrate.
+
+    Parameters
+    ----------
+    wvls: ndarray
+        Wavelength grid of shape (n_wvl,).
+    R_front, T_front, R_front_reverse, T_front_reverse: ndarray
+        Spectra of shape (..., n_angles, n_wvl) for the given polarization. For unpolarized
+        light with `front_p`, these are the s-polarized spectra.
+    theta: ndarray
+        Angles of incidence in degrees, shape (n_angles,). The wavelength axis is added here,
+        unlike the low-level utils functions that expect theta[:, None].
+    polarization: int
+        P_POLARIZED, S_POLARIZED or UNPOLARIZED. For unpolarized light, the s and p
+        corrections are computed separately and averaged.
+    substrate_name: str
+        Name of the substrate in the material database. Ignored if N_substrate is given.
+    N_substrate: ndarray, optional
+        Complex refractive index of the substrate on the wavelength grid.
+    thickness: float
+        Substrate thickness, in the units of the wavelength grid.
+    n_medium: float
+        Refractive index of the ambient medium.
+    front_p: tuple, optional
+        (R_front, T_front, R_front_reverse, T_front_reverse) of the p-polarized front side,
+        used together with the s-polarized spectra for unpolarized light.
+
+    Returns
+    -------
+    ndarray
+        R and T maps with the broadcast shape of the inputs.
+
+    Notes
+    -----
+    Without `front_p`, unpolarized light applies the s and p backside corrections to the same
+    (unpolarized) front spectra. This is an approximation: it is exact at normal incidence and
+    for a front side whose s and p spectra coincide, and it degrades at large angles where the
+    front side is strongly polarizing. Simulate both polarizations and pass `front_p` when it matters.
+    """
+    wvls = np.asarray(wvls, dtype=float)
+    N_substrate = _prepare_substrate_constants(wvls, substrate_name, N_substrate)
+    theta = np.asarray(theta, dtype=float)[..., np.newaxis]
+
+    beta = compute_refracted_absorption_term(wvls, N_substrate, theta=theta, thickness=thickness, n_medium=n_medium)
+
+    def _correct(polarization, R_front, T_front, R_front_reverse, T_front_reverse):
+        R_back = compute_backside_fresnel(N_substrate, theta=theta, polarization=polarization, n_medium=n_medium)
+        T_back = 1.0 - R_back
+        R = compute_R_with_backside(wvls, R_front, T_front, R_front_reverse, T_front_reverse, R_back, beta)
+        T = compute_T_with_backside(wvls, T_front, R_front_reverse, T_back, R_back, beta)
+        return R, T
+
+    front = (R_front, T_front, R_front_reverse, T_front_reverse)
+    if polarization == UNPOLARIZED:
+        (R_s, T_s), (R_p, T_p) = _correct(S_POLARIZED, *front), _correct(P_POLARIZED, *(front if front_p is None else front_p))
+        return 0.5 * (R_s + R_p), 0.5 * (T_s + T_p)
+
+    return _correct(polarization, *front)
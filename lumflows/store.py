@@ -0,0 +1,160 @@
+# This module shares stacks of spectra between processes without copying them
+
+import os
+import uuid
+import numpy as np
+from multiprocessing import shared_memory
+from .spectral_tools import compute_with_backside_batch
+
+class _SharedBuffer():
+    # Base object of the arrays over a shared memory segment: every view of the store refers to it,
+    # so the segment stays mapped until the last view is garbage-collected
+    def __init__(self, memory, size):
+        self.memory = memory
+        self.__array_interface__ = np.ndarray((size,), dtype=np.float64, buffer=memory.buf).__array_interface__
+
+class SpectraStore():
+    # Spectral channels held for every run
+    CHANNELS = ("R_f", "T_f", "R_r", "T_r", "R", "T")
+
+    def __init__(self, handle, buffer, owner = False, memory = None):
+        # Use create() or attach() instead
+        self.handle = handle
+        self.owner = owner
+        self._memory = memory
+        self._buffer = buffer
+
+        n_runs, n_wvl = handle["n_runs"], handle["n_wvl"]
+        self.wvls = buffer[:n_wvl]
+        self.spectra = buffer[n_wvl:].reshape(len(self.CHANNELS), n_runs, n_wvl)
+
+    @staticmethod
+    def _size(n_runs, n_wvl):
+        return n_wvl + len(SpectraStore.CHANNELS) * n_runs * n_wvl
+
+    @classmethod
+    def create(cls, n_runs, wvls, path = None):
+        """
+        Allocates a store for `n_runs` spectra on the wavelength grid `wvls`.
+
+        Parameters:
+        -----------
+        n_runs : int
+            The number of runs (rows) of every channel.
+
+        wvls : ndarray
+            The wavelength grid shared by all runs.
+
+        path : str, optional
+            If given, the store is a memory-mapped file at this path; otherwise it lives in
+            `multiprocessing.shared_memory`.
+
+        Returns:
+        --------
+        SpectraStore
+            The store, owning the underlying memory. All channels are initialized to zero.
+        """
+        wvls = np.asarray(wvls, dtype=np.float64)
+        handle = {"n_runs": int(n_runs), "n_wvl": len(wvls)}
+        size = cls._size(n_runs, len(wvls))
+
+        if path is None:
+            handle["name"] = "lumflows_" + uuid.uuid4().hex[:16]
+            memory = shared_memory.SharedMemory(name=handle["name"], create=True, size=size * 8)
+            buffer = np.asarray(_SharedBuffer(memory, size))
+            buffer[:] = 0.0
+        else:
+            handle["path"] = os.path.abspath(path)
+            memory = None
+            buffer = np.memmap(handle["path"], dtype=np.float64, mode="w+", shape=(size,))
+
+        store = cls(handle, buffer, owner=True, memory=memory)
+        store.wvls[:] = wvls
+        return store
+
+    @classmethod
+    def attach(cls, handle):
+        """
+        Attaches to an existing store, e.g. in a worker process.
+
+        The handle (SpectraStore.handle) is a small dictionary, cheap to send to workers.
+        """
+        size = cls._size(handle["n_runs"], handle["n_wvl"])
+
+        if "path" in handle:
+            return cls(handle, np.memmap(handle["path"], dtype=np.float64, mode="r+", shape=(size,)))
+
+        try:
+            # Python >= 3.13: attaching processes must not unlink the segment at exit
+            memory = shared_memory.SharedMemory(name=handle["name"], track=False)
+        except TypeError:
+            memory = shared_memory.SharedMemory(name=handle["name"])
+
+        return cls(handle, np.asarray(_SharedBuffer(memory, size)), memory=memory)
+
+    def __getitem__(self, channel):
+        """ Returns the (n_runs, n_wvl) view of a channel, e.g. store["R_f"]. """
+        return self.spectra[self.CHANNELS.index(channel)]
+
+    def __len__(self):
+        return self.handle["n_runs"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def flush(self):
+        """ Writes the memory-mapped store to disk. """
+        if isinstance(self._buffer, np.memmap):
+            self._buffer.flush()
+
+    def close(self):
+        """
+        Releases this view of the store; the owner also removes the shared memory segment.
+
+        Channel arrays obtained from the store remain valid after close(): the segment is
+        unmapped once the last of them is garbage-collected.
+        """
+        self.flush()
+        self.wvls = self.spectra = self._buffer = None
+
+        if self._memory is not None:
+            if self.owner:
+                self._memory.unlink()
+            self._memory = None
+
+def correct_with_backside_inplace(handle, runs = slice(None), **kwargs):
+    """
+    Applies the backside correction to a range of runs of a store and writes R and T in place.
+
+    Designed as a worker function for a process pool: only the handle and the run range
+    are pickled, the spectra are read from and written to the shared store.
+
+    Parameters:
+    -----------
+    handle : dict
+        The handle of the store (SpectraStore.handle).
+
+    runs : slice
+        The runs to process.
+
+    **kwargs :
+        Passed to spectral_tools.compute_with_backside_batch() (e.g. substrate_name, thickness).
+
+    Example:
+        with SpectraStore.create(n_runs, wvls) as store:
+            ...  # fill store["R_f"], store["T_f"], ...
+            chunks = [slice(i, i + 1000) for i in range(0, n_runs, 1000)]
+            with ProcessPoolExecutor() as pool:
+                list(pool.map(partial(correct_with_backside_inplace, store.handle), chunks))
+    """
+    store = SpectraStore.attach(handle)
+    try:
+        R, T = compute_with_backside_batch(store.wvls, store["R_f"][runs], store["T_f"][runs],
+                                           store["R_r"][runs], store["T_r"][runs], **kwargs)
+        store["R"][runs] = R
+        store["T"][runs] = T
+    finally:
+        store.close()
@@ -0,0 +1,199 @@
+# This module runs parameter sweeps over a pool of FDTD sessions
+
+import itertools
+import queue
+import threading
+import time
+from .api import FDTD
+
+def parameter_grid(**axes):
+    """
+    Builds the full factorial grid of sweep points.
+
+    Example:
+        parameter_grid(theta=[0, 30, 60], polarization=[P_POLARIZED, S_POLARIZED])
+        -> [{"theta": 0, "polarization": 0}, {"theta": 0, "polarization": 90}, ...]
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+def _default_extract(fdtd, point):
+    return fdtd.collect()
+
+class SweepRunner():
+    def __init__(self, setup, extract = None, sessions = 2, threads_per_session = None, retries = 1, session_factory = None, **session_kwargs):
+        """
+        Runs the points of a sweep concurrently on a pool of FDTD sessions.
+
+        Parameters:
+        -----------
+        setup : callable
+            setup(fdtd, point) prepares the model of a sweep point in the given session,
+            e.g. loads a project and sets the source angle. It must not run the simulation.
+
+        extract : callable, optional
+            extract(fdtd, point) returns the results of a finished run.
+            Defaults to fdtd.collect() over the monitors added in the session.
+
+        sessions : int
+            The number of solver sessions run concurrently.
+
+        threads_per_session : int, optional
+            Passed to every session as the "threads" server argument.
+
+        retries : int
+            How many times a failed point is retried. Every retry uses a fresh session.
+
+        session_factory : callable, optional
+            Creates a new session; overrides the default FDTD(hide=True, **session_kwargs).
+            Useful to run the sweep against a stub lumapi.
+
+        **session_kwargs :
+            Extra arguments of FDTD(), e.g. filename or remoteArgs.
+
+        Notes:
+        ------
+        - Each session is a separate solver process driven by its own Python thread.
+          The threads only wait for the solver, so the GIL is not a bottleneck.
+        """
+        if sessions < 1:
+            raise ValueError("At least one session is required.")
+
+        self.setup = setup
+        self.extract = _default_extract if extract is None else extract
+        self.sessions = sessions
+        self.threads_per_session = threads_per_session
+        self.retries = retries
+        self.session_factory = session_factory
+        self.session_kwargs = session_kwargs
+
+    def _new_session(self):
+        if self.session_factory is not None:
+            return self.session_factory()
+
+        kwargs = dict(self.session_kwargs)
+        kwargs.setdefault("hide", True)
+        if self.threads_per_session is not None:
+            server_args = dict(kwargs.get("serverArgs", {}))
+            server_args.setdefault("threads", str(self.threads_per_session))
+            kwargs["serverArgs"] = server_args
+
+        return FDTD(**kwargs)
+
+    @staticmethod
+    def _close_session(fdtd):
+        try:
+            fdtd.close()
+        except Exception:
+            pass
+
+    def run_point(self, fdtd, point):
+        """ Prepares, runs and extracts a single point in the given session. """
+        self.setup(fdtd, point)
+        fdtd.run_simulation()
+        return self.extract(fdtd, point)
+
+    def _worker(self, session_index, tasks, results, on_result, journal, locate, persist_lock):
+        fdtd = None
+        try:
+            while True:
+                try:
+                    index, point = tasks.get_nowait()
+                except queue.Empty:
+                    return
+
+                record = {"point": point, "result": None, "error": None, "attempts": 0,
+                          "session": session_index, "elapsed": 0.0}
+                start = time.perf_counter()
+
+                while record["attempts"] <= self.retries:
+                    record["attempts"] += 1
+                    try:
+                        if fdtd is None:
+                            fdtd = self._new_session()
+                        record["result"] = self.run_point(fdtd, point)
+                        record["error"] = None
+                        break
+                    except Exception as e:
+                        record["error"] = e
+                        # The session may be in an unknown state, start over with a fresh one
+                        if fdtd is not None:
+                            self._close_session(fdtd)
+                            fdtd = None
+
+                record["elapsed"] = time.perf_counter() - start
+                if record["error"] is None and (journal is not None or locate is not None):
+                    # Storing a result and journaling its location is one step: a location must
+                    # never be recorded for another point's result
+                    try:
+                        with persist_lock:
+                            location = None if locate is None else locate(point, record["result"])
+                            if journal is not None:
+                                journal.record(point, location, elapsed=record["elapsed"])
+                    except Exception as e:
+                        # Not persisted, so not journaled: a resumed sweep runs the point again
+                        record["error"] = e
+                results[index] = record
+                if on_result is not None:
+                    try:
+                        on_result(index, record)
+                    except Exception as e:
+                        record["error"] = e
+        finally:
+            if fdtd is not None:
+                self._close_session(fdtd)
+
+    def run(self, points, on_result = None, journal = None, locate = None):
+        """
+        Runs all sweep points.
+
+        Parameters:
+        -----------
+        points : list of dict
+            The sweep points, e.g. from parameter_grid().
+
+        on_result : callable, optional
+            on_result(index, record) is called from the worker threads as soon as a point is done.
+
+        journal : SweepJournal, optional
+            Points already recorded in the journal are skipped, every successful point is recorded.
+            Rerunning an interrupted sweep with the same journal resumes it.
+
+        locate : callable, optional
+            locate(point, result) stores the result of a successful point and returns its
+            JSON-serializable location for the journal, e.g. the index returned by
+            SweepDataset.append(). The calls of locate() and the journal entries are serialized,
+            so locate() does not need to be thread-safe.
+
+        Notes:
+        ------
+        - An exception raised by locate(), the journal or on_result() becomes the error of its
+          point and the sweep goes on. If locate() or the journal failed, the point is not journaled.
+
+        Returns:
+        --------
+        list of dict
+            One record per point, in the order of `points`, with the keys "point", "result",
+            "error" (None on success), "attempts", "session" and "elapsed" (seconds).
+            Points skipped because of the journal have 0 attempts, no session and their
+            journaled location as the result.
+        """
+        tasks = queue.Queue()
+        results = [None] * len(points)
+        for index, point in enumerate(points):
+            entry = None if journal is None else journal.get(point)
+            if entry is None:
+                tasks.put((index, point))
+            else:
+                results[index] = {"point": point, "result": entry["location"], "error": None, "attempts": 0,
+                                  "session": None, "elapsed": 0.0}
+
+        persist_lock = threading.Lock()
+        workers = [threading.Thread(target=self._worker, args=(i, tasks, results, on_result, journal, locate, persist_lock), daemon=True)
+                   for i in range(min(self.sessions, tasks.qsize()))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        return results
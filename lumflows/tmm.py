@@ -0,0 +1,116 @@
+# This module computes R and T of planar thin-film stacks with the (coherent) transfer-matrix method
+
+import numpy as np
+from math import pi
+from .definitions import P_POLARIZED, S_POLARIZED, UNPOLARIZED
+from .utils import get_substrate_constants, _sqrt_branch
+
+def _refractive_index(material, wvls):
+    # Material names are looked up in the material database, numbers and arrays are used as is
+    if isinstance(material, str):
+        return get_substrate_constants(material, wvls)
+
+    return np.asarray(material, dtype=complex)
+
+def _characteristic_product(wvls, indices, thicknesses, n_sin_theta, polarization):
+    # Multiply the characteristic matrices of all layers, element-wise over the broadcast axes
+    m11, m12, m21, m22 = 1.0 + 0j, 0j, 0j, 1.0 + 0j
+
+    for N, thickness in zip(indices, thicknesses):
+        N_cos = _sqrt_branch(N * N - n_sin_theta * n_sin_theta)
+        eta = N_cos if polarization == S_POLARIZED else N * N / N_cos
+        delta = 2 * pi * np.asarray(thickness, dtype=float) * N_cos / wvls
+
+        cos_delta, sin_delta = np.cos(delta), np.sin(delta)
+        l11, l12, l21, l22 = cos_delta, 1j * sin_delta / eta, 1j * eta * sin_delta, cos_delta
+
+        m11, m12, m21, m22 = (m11 * l11 + m12 * l21, m11 * l12 + m12 * l22,
+                              m21 * l11 + m22 * l21, m21 * l12 + m22 * l22)
+
+    return m11, m12, m21, m22
+
+def _tmm_polarized(wvls, indices, thicknesses, theta, polarization, n_incident, N_exit):
+    n_sin_theta = n_incident * np.sin(np.radians(theta))
+
+    def _admittance(N):
+        N_cos = _sqrt_branch(N * N - n_sin_theta * n_sin_theta)
+        return N_cos if polarization == S_POLARIZED else N * N / N_cos
+
+    eta_0, eta_exit = _admittance(np.asarray(n_incident, dtype=complex)), _admittance(N_exit)
+    m11, m12, m21, m22 = _characteristic_product(wvls, indices, thicknesses, n_sin_theta, polarization)
+
+    B = m11 + m12 * eta_exit
+    C = m21 + m22 * eta_exit
+    denominator = eta_0 * B + C
+
+    R = np.abs((eta_0 * B - C) / denominator) ** 2
+    T = 4.0 * np.real(eta_0) * np.real(eta_exit) / np.abs(denominator) ** 2
+
+    return R, T
+
+def tmm(wvls, layers, thicknesses, theta = 0.0, polarization = UNPOLARIZED, n_incident = 1.0003, exit_medium = "B270"):
+    """
+    Compute R, T and A of a planar stack of thin films on a semi-infinite exit medium.
+
+    All arguments broadcast against each other following the NumPy rules, so wavelengths,
+    angles and layer thicknesses can be swept in a single call, e.g. theta[:, None] with a
+    (n_wvl,) grid yields (angle x wavelength) spectra.
+
+    Parameters
+    ----------
+    wvls: ndarray
+        The wavelength grid.
+    layers: list
+        The layers from the incidence side, given as material names from the database or
+        as complex refractive indices (N = n - ik), scalar or on the wavelength grid.
+    thicknesses: list
+        Thickness of every layer (float or ndarray), in the units of the wavelength grid.
+    theta: float or ndarray
+        Angle(s) of incidence in degrees.
+    polarization: int
+        P_POLARIZED, S_POLARIZED or UNPOLARIZED (the mean of s and p).
+    n_incident: float
+        Refractive index of the (lossless) incidence medium.
+    exit_medium: str or complex or ndarray
+        The semi-infinite medium behind the stack, e.g. the substrate.
+
+    Returns
+    -------
+    ndarray
+        R, T and A of the stack. T is the power transmitted into the exit medium, so R and T
+        of a coating on a thick substrate can be passed on to compute_with_backside().
+    """
+    if len(layers) != len(thicknesses):
+        raise RuntimeError("Every layer must have a thickness.")
+
+    wvls = np.asarray(wvls, dtype=float)
+    theta = np.asarray(theta, dtype=float)
+    indices = [_refractive_index(layer, wvls) for layer in layers]
+    N_exit = _refractive_index(exit_medium, wvls)
+
+    if polarization == UNPOLARIZED:
+        R_s, T_s = _tmm_polarized(wvls, indices, thicknesses, theta, S_POLARIZED, n_incident, N_exit)
+        R_p, T_p = _tmm_polarized(wvls, indices, thicknesses, theta, P_POLARIZED, n_incident, N_exit)
+        R, T = 0.5 * (R_s + R_p), 0.5 * (T_s + T_p)
+    elif polarization in (S_POLARIZED, P_POLARIZED):
+        R, T = _tmm_polarized(wvls, indices, thicknesses, theta, polarization, n_incident, N_exit)
+    else:
+        raise ValueError(f"Unknown polarization: {polarization}.")
+
+    return R, T, 1.0 - R - T
+
+def rta(wvls, layers, thicknesses, theta = 0.0, polarization = UNPOLARIZED, n_incident = 1.0003, exit_medium = "B270"):
+    """
+    Compute R, T and A of a planar stack in the format of parsers.single_rta().
+
+    Takes the same arguments as tmm() for a single configuration (scalar angle and thicknesses).
+
+    Returns
+    -------
+    ndarray
+        R, T and A as 2xn arrays of wavelengths and data.
+    """
+    wvls = np.asarray(wvls, dtype=float)
+    R, T, A = tmm(wvls, layers, thicknesses, theta=theta, polarization=polarization, n_incident=n_incident, exit_medium=exit_medium)
+
+    return tuple(np.array([wvls, np.broadcast_to(data, wvls.shape)]) for data in (R, T, A))
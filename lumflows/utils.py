@@ -1,17 +1,31 @@
 import os
+import json
+import hashlib
 import numpy as np
-from math import pi, sin, radians, exp
-from cmath import sqrt
+from math import pi
+from .cache import LRUCache
+from .definitions import P_POLARIZED, S_POLARIZED, UNPOLARIZED
 
 DISPERSION_SUFFIX = "_nk"
 #SPECTRAL_DATA_SUFFIX = "_rt" # Deprecated because we calculate R and T at the backside interface ourselves
 EXTENSION = ".txt"
 
+# Compiled (binary) form of the material database, see matdb.build_material_db().
+# Every build writes its data to materials-<build id>.npy, named in the index.
+COMPILED_DATA_PREFIX = "materials-"
+COMPILED_INDEX = "materials.json"
+COMPILED_VERSION = 2
+
+# Process-level caches for the material database
+MATERIAL_CACHE = LRUCache(maxsize=32)
+SUBSTRATE_N_CACHE = LRUCache(maxsize=128)
+COMPILED_DB_CACHE = LRUCache(maxsize=2)
+
 def num_points(start: float, end: float, step: float) -> int:    
     return int(np.ceil((end - start) / step)) + 1
 
 def normalize(x):
-    return (x - min(x)) / (max(x) - min(x))
+    return (x - np.min(x)) / (np.max(x) - np.min(x))
 
 def zeros_like(array):
     return np.zeros_like(array, dtype=float)
@@ -19,18 +33,94 @@ def zeros_like(array):
 def _get_root_dir():
     return os.path.dirname(os.path.abspath(__file__))
 
+def _get_db_dir():
+    return os.path.join(_get_root_dir(), "db")
+
 def _get_mat_file(filename):
-    root = _get_root_dir()
-    file = os.path.join(root, "db", filename)
+    file = os.path.join(_get_db_dir(), filename)
     if not os.path.exists(file):
         raise FileNotFoundError(f"File '{filename}' not found in the database!")
     
     return file
 
+def _load_mat_file(file):
+    data = np.loadtxt(file, delimiter="\t", skiprows=1).transpose() # TODO: remove any formatting, must be taken care by user
+    data.setflags(write=False)
+    return data
+
+def _load_compiled_db():
+    """ Return the (index, memory-mapped data) pair of the compiled database, or None if it is absent. """
+    index_file = os.path.join(_get_db_dir(), COMPILED_INDEX)
+
+    def _open():
+        with open(index_file, "r") as f:
+            index = json.load(f)
+        if index.get("version") != COMPILED_VERSION:
+            return None
+
+        # The index names the data file of its own build, so a rebuild can never pair it with other data
+        data = np.load(os.path.join(_get_db_dir(), index["data"]), mmap_mode="r")
+        if data.shape != (3, index["size"]):
+            raise RuntimeError(f"The compiled material database '{index['data']}' does not match its index.")
+        return index, data
+
+    # A concurrent rebuild may remove the data of the index read just before, read the new index then
+    for _ in range(3):
+        try:
+            stat = os.stat(index_file)
+            return COMPILED_DB_CACHE.get_or_compute((stat.st_ino, stat.st_mtime_ns), _open)
+        except FileNotFoundError:
+            continue
+
+    return None
+
+def _compiled_entry(filename):
+    compiled = _load_compiled_db()
+    if compiled is None:
+        return None
+
+    index, data = compiled
+    entry = index["materials"].get(filename)
+    if entry is None:
+        return None
+
+    return entry, data
+
+def _mat_file_key(filename):
+    file = os.path.join(_get_db_dir(), filename + DISPERSION_SUFFIX + EXTENSION)
+    try:
+        return file, (filename, os.stat(file).st_mtime_ns)
+    except FileNotFoundError:
+        # The text source may be absent if the material only ships in the compiled form
+        compiled = _compiled_entry(filename)
+        if compiled is None:
+            raise FileNotFoundError(f"File '{filename + DISPERSION_SUFFIX + EXTENSION}' not found in the database!")
+
+        return None, (filename, compiled[0]["mtime_ns"])
+
+def _load_material(filename, file, mtime):
+    compiled = _compiled_entry(filename)
+    if compiled is not None:
+        entry, data = compiled
+        # Use the compiled data unless the text source changed after the database was built
+        if entry["mtime_ns"] == mtime:
+            offset, length = entry["offset"], entry["length"]
+            return data[:, offset:offset + length]
+
+    return _load_mat_file(file)
+
 def read_mat_file(filename):
-    file = _get_mat_file(filename + DISPERSION_SUFFIX + EXTENSION)
-    
-    return np.loadtxt(file, delimiter="\t", skiprows=1).transpose() # TODO: remove any formatting, must be taken care by user
+    """
+    Read the dispersion data (wavelength, n, k) of a material from the database.
+
+    If the compiled database is present and up to date, a memory-mapped view into it is
+    returned instead of parsing the text file. The data is cached per material and file
+    modification time, so the file is read again only after it changes.
+    The returned array is read-only.
+    """
+    file, key = _mat_file_key(filename)
+
+    return MATERIAL_CACHE.get_or_compute(key, lambda: _load_material(filename, file, key[1]))
 
 # Deprecated because we calculate R and T at the backside interface ourselves
 #def read_spectrum_file(filename):
@@ -54,6 +144,37 @@ def interpolate_substrate_constants(substrate_constants, new_wvls):
 
     return N
 
+def _grid_hash(wvls):
+    wvls = np.ascontiguousarray(wvls, dtype=float)
+    return hashlib.blake2b(wvls.tobytes(), digest_size=16).hexdigest(), wvls.shape
+
+def get_substrate_constants(substrate_name, wvls):
+    """
+    Return the complex refractive index of a database material interpolated on `wvls`.
+
+    Results are memoized per (material, file modification time, wavelength grid), so
+    repeated requests for the same grid skip both parsing and interpolation.
+    The returned array is read-only.
+    """
+    _, material_key = _mat_file_key(substrate_name)
+
+    def _compute():
+        N = interpolate_substrate_constants(read_mat_file(substrate_name), wvls)
+        N.setflags(write=False)
+        return N
+
+    return SUBSTRATE_N_CACHE.get_or_compute((material_key, _grid_hash(wvls)), _compute)
+
+def material_cache_info():
+    """ Return hit/miss statistics of the material and interpolation caches. """
+    return {"materials": MATERIAL_CACHE.info(), "substrate_constants": SUBSTRATE_N_CACHE.info()}
+
+def clear_material_cache():
+    """ Drop all cached material data. """
+    MATERIAL_CACHE.clear()
+    SUBSTRATE_N_CACHE.clear()
+    COMPILED_DB_CACHE.clear()
+
 # Deprecated because we calculate R and T at the backside interface ourselves
 #def interpolate_substrate_spectral_data(substrate_spectra, new_wvls):
 #    init_wvls, r, t = substrate_spectra[0], substrate_spectra[1], substrate_spectra[2]
@@ -77,58 +198,92 @@ def _compute_T_backside(R_back):
     return 1.0 - R_back
 
 def compute_substrate_spectra(wvls, N_substrate):
-    R_back = zeros_like(wvls)
-    T_back = zeros_like(R_back)
-
-    for i in range(len(wvls)):
-        R_back[i] = _compute_R_backside(N_substrate[i])
-        T_back[i] = _compute_T_backside(R_back[i])
+    R_back = _compute_R_backside(np.asarray(N_substrate))
+    T_back = _compute_T_backside(R_back)
 
     return R_back, T_back
 
-def _compute_beta(wvls, N, theta, thickness):
-    two_pi = 2 * pi
-    # Compute the substrate absoprtion term
-    beta_i = zeros_like(wvls)
-    sin_theta: float = sin(radians(theta))
-
-    for i in range(len(wvls)):
-        # alpha squared
-        n_sin_theta: complex = N[i] * sin_theta
-        sin2: complex = n_sin_theta * n_sin_theta
-        
-        N_square: complex = N[i] * N[i]
-        N_s_s: complex = sqrt(N_square - sin2)
-    
-        # Correct branch selection
-        if N_s_s.real == 0.0:
-            N_s_s = -N_s_s
-    
-        beta_i[i] = np.imag(two_pi * thickness * N_s_s / wvls[i])
-
-    return beta_i
-
-def compute_absoprtion_term(wvls, N, theta = 0.0, thickness = 2000000.0):
-    return _compute_beta(wvls=wvls, N=N, theta=theta, thickness=thickness)
+def _sqrt_branch(z):
+    # Complex square root with the branch selection used for the substrate wave vector
+    z = np.sqrt(np.asarray(z, dtype=complex))
+    return np.where(z.real == 0.0, -z, z)
+
+def _normal_components(N, theta, n_medium):
+    # N cos(theta_N) in the substrate and the ambient medium, from the Snell invariant n_medium * sin(theta)
+    n_sin_theta = n_medium * np.sin(np.radians(np.asarray(theta, dtype=float)))
+    N = np.asarray(N, dtype=complex)
+
+    return _sqrt_branch(N * N - n_sin_theta * n_sin_theta), _sqrt_branch(n_medium * n_medium - n_sin_theta * n_sin_theta)
+
+def _compute_beta(wvls, N, theta, thickness, n_medium = 1.0003):
+    """
+    Compute the substrate absorption term on the whole wavelength grid at once.
+
+    `theta` is the angle of incidence in the ambient medium; the light is refracted into the
+    substrate, so the absorption grows with the angle. `theta` and `thickness` may be scalars
+    or arrays; they are broadcast against `wvls` following the NumPy rules, e.g. theta[:, None]
+    yields an (angle x wavelength) array.
+    """
+    N_cos, _ = _normal_components(N, theta, n_medium)
+
+    return np.imag(2 * pi * np.asarray(thickness, dtype=float) * N_cos / np.asarray(wvls, dtype=float))
+
+def compute_absoprtion_term(wvls, N, theta = 0.0, thickness = 2000000.0, n_medium = 1.0003):
+    return _compute_beta(wvls=wvls, N=N, theta=theta, thickness=thickness, n_medium=n_medium)
+
+def compute_backside_fresnel(N_substrate, theta = 0.0, polarization = UNPOLARIZED, n_medium = 1.0003):
+    """
+    Reflectance of the uncoated backside interface (substrate -> ambient medium) at oblique incidence.
+
+    Parameters
+    ----------
+    N_substrate: ndarray
+        Complex refractive index of the substrate on the wavelength grid.
+    theta: float or ndarray
+        Angle(s) of incidence in degrees, in the ambient medium. Broadcast against N_substrate,
+        e.g. theta[:, None] yields an (angle x wavelength) array.
+    polarization: int
+        P_POLARIZED, S_POLARIZED or UNPOLARIZED (the mean of the s and p reflectances).
+    n_medium: float
+        Refractive index of the ambient medium.
+
+    Returns
+    -------
+    ndarray
+        The backside reflectance.
+    """
+    N = np.asarray(N_substrate, dtype=complex)
+    N_cos, n_cos = _normal_components(N, theta, n_medium)
+
+    r_s = (N_cos - n_cos) / (N_cos + n_cos)
+    r_p = (N * N * n_cos - n_medium * n_medium * N_cos) / (N * N * n_cos + n_medium * n_medium * N_cos)
+    R_s, R_p = np.abs(r_s) ** 2, np.abs(r_p) ** 2
+
+    if polarization == S_POLARIZED:
+        return R_s
+    if polarization == P_POLARIZED:
+        return R_p
+    if polarization == UNPOLARIZED:
+        return 0.5 * (R_s + R_p)
+
+    raise ValueError(f"Unknown polarization: {polarization}.")
+
+def compute_refracted_absorption_term(wvls, N, theta = 0.0, thickness = 2000000.0, n_medium = 1.0003):
+    """
+    Substrate absorption term for light incident at `theta` (in the ambient medium) and refracted into the substrate.
+
+    Same as compute_absoprtion_term().
+    """
+    return _compute_beta(wvls=wvls, N=N, theta=theta, thickness=thickness, n_medium=n_medium)
 
 def _T_with_backside(T_front, R_front_reverse, T_back, R_back, beta):
-    return (T_front * T_back * exp(2.0*beta)) / (1.0 - R_front_reverse * R_back * exp(4.0*beta))
+    return (T_front * T_back * np.exp(2.0*beta)) / (1.0 - R_front_reverse * R_back * np.exp(4.0*beta))
 
 def _R_with_backside(R_front, T_front, R_front_reverse, T_front_reverse, R_back, beta):
-    return R_front + ((T_front * T_front_reverse * R_back * exp(4.0*beta)) / (1.0 - R_front_reverse * R_back * exp(4.0*beta)))
+    return R_front + ((T_front * T_front_reverse * R_back * np.exp(4.0*beta)) / (1.0 - R_front_reverse * R_back * np.exp(4.0*beta)))
 
 def compute_T_with_backside(wvls, T_front, R_front_reverse, T_back, R_back, beta):
-    T = zeros_like(wvls)
-
-    for i in range(len(wvls)):
-        T[i] = _T_with_backside(T_front=T_front[i], R_front_reverse=R_front_reverse[i], T_back=T_back[i], R_back=R_back[i], beta=beta[i])
-
-    return T
+    return _T_with_backside(T_front=np.asarray(T_front), R_front_reverse=np.asarray(R_front_reverse), T_back=np.asarray(T_back), R_back=np.asarray(R_back), beta=np.asarray(beta))
 
 def compute_R_with_backside(wvls, R_front, T_front, R_front_reverse, T_front_reverse, R_back, beta):
-    R = zeros_like(wvls)
-
-    for i in range(len(wvls)):
-        R[i] = _R_with_backside(R_front=R_front[i], T_front=T_front[i], R_front_reverse=R_front_reverse[i], T_front_reverse=T_front_reverse[i], R_back=R_back[i], beta=beta[i])
-
-    return R
\ No newline at end of file
+    return _R_with_backside(R_front=np.asarray(R_front), T_front=np.asarray(T_front), R_front_reverse=np.asarray(R_front_reverse), T_front_reverse=np.asarray(T_front_reverse), R_back=np.asarray(R_back), beta=np.asarray(beta))
@@ -0,0 +1,23 @@
+import os
+import sys
+import types
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fake_lumapi
+
+@pytest.fixture
+def lumapi(monkeypatch):
+    """ Replaces lumapi with the in-process fake for the duration of a test. """
+    import lumflows.session
+
+    module = types.ModuleType("lumapi")
+    module.FDTD = fake_lumapi.FDTD
+    monkeypatch.setitem(sys.modules, "lumapi", module)
+    monkeypatch.setattr(lumflows.session, "_lumapi", None)
+    monkeypatch.setattr(fake_lumapi.FDTD, "on_run", None)
+    monkeypatch.setattr(fake_lumapi.FDTD, "instances", [])
+
+    return fake_lumapi
@@ -0,0 +1,181 @@
+# A minimal in-process stand-in for the lumapi module, used to test the session wrappers without Lumerical
+
+import ast
+import json
+import re
+import numpy as np
+
+_SETTER = re.compile(r"^(setnamed|setglobalmonitor)\((.*)\);$")
+_ASSIGN = re.compile(r"^(\w+)\s*=\s*struct;$")
+_FIELD = re.compile(r"^(\w+)\.(\w+)\s*=\s*(\w+)\((.*)\);$")
+
+def _parse_value(text):
+    # Lumerical script literals: numbers, quoted strings and [a,b;c,d] matrices
+    text = text.strip()
+    if text.startswith("["):
+        rows = [[float(x) for x in row.split(",")] for row in text[1:-1].split(";")]
+        return np.array(rows)
+    return ast.literal_eval(text)
+
+def _split_arguments(text):
+    arguments, depth, quote, current = [], 0, None, ""
+    for char in text:
+        if quote:
+            quote = None if char == quote else quote
+        elif char in "\"'":
+            quote = char
+        elif char == "[":
+            depth += 1
+        elif char == "]":
+            depth -= 1
+        elif char == "," and depth == 0:
+            arguments.append(current)
+            current = ""
+            continue
+        current += char
+    arguments.append(current)
+    return [_parse_value(argument) for argument in arguments]
+
+class FDTD():
+    """
+    Keeps the object properties in a dictionary and "solves" by storing fake monitor data.
+
+    Hooks for tests:
+    - on_run(session) is called by run(), e.g. to raise a solver error.
+    - run() rewrites the current project file, like the solver saving its results.
+    - failed_jobs is a set of project files runjobs() leaves untouched.
+    """
+    on_run = None
+    instances = []
+
+    def __init__(self, filename = None, hide = False, serverArgs = {}, remoteArgs = {}):
+        self.properties = {}
+        self.global_monitor = {}
+        self.calls = []
+        self.evals = []
+        self.variables = {}
+        self.jobs = []
+        self.failed_jobs = set()
+        self.solved = False
+        self.layout = True
+        self.closed = False
+        self.file = None
+        FDTD.instances.append(self)
+
+    def _log(self, name, *args):
+        self.calls.append((name, args))
+
+    def setnamed(self, object_name, prop, value):
+        self._log("setnamed", object_name, prop, value)
+        self.properties[(object_name, prop)] = value
+
+    def getnamed(self, object_name, prop):
+        self._log("getnamed", object_name, prop)
+        return self.properties.get((object_name, prop), 0.0)
+
+    def setglobalmonitor(self, prop, value):
+        self._log("setglobalmonitor", prop, value)
+        self.global_monitor[prop] = value
+
+    def addfdtd(self, **kwargs):
+        self._log("addfdtd", kwargs)
+
+    def addpower(self, **kwargs):
+        self._log("addpower", kwargs)
+
+    def addplane(self, **kwargs):
+        self._log("addplane", kwargs)
+
+    def set(self, *args):
+        self._log("set", *args)
+
+    def switchtolayout(self):
+        self._log("switchtolayout")
+        self.layout = True
+        self.solved = False
+
+    def run(self):
+        self._log("run")
+        if FDTD.on_run is not None:
+            FDTD.on_run(self)
+        self.layout = False
+        self.solved = True
+        # Like Lumerical, store the results in the current project file
+        if self.file is not None:
+            self.save(self.file)
+
+    def havedata(self, name = None, data = None):
+        return 1 if self.solved else 0
+
+    def _frequencies(self):
+        return np.linspace(1e14, 1e15, 11)
+
+    def getdata(self, monitor_name, data):
+        self._log("getdata", monitor_name, data)
+        if data == "f":
+            return self._frequencies()[:, np.newaxis]
+        return np.full((11, 1), float(len(monitor_name)))
+
+    def transmission(self, monitor_name):
+        self._log("transmission", monitor_name)
+        return np.full((11, 1), 0.5)
+
+    def eval(self, script):
+        self._log("eval", script)
+        self.evals.append(script)
+        for line in script.split("\n"):
+            line = line.strip()
+            setter = _SETTER.match(line)
+            assign = _ASSIGN.match(line)
+            field = _FIELD.match(line)
+            if setter:
+                getattr(self, setter.group(1))(*_split_arguments(setter.group(2)))
+            elif assign:
+                self.variables[assign.group(1)] = {}
+            elif field:
+                variable, name, function, arguments = field.groups()
+                self.variables[variable][name] = getattr(self, function)(*_split_arguments(arguments))
+            else:
+                raise RuntimeError(f"Fake lumapi cannot evaluate: {line}")
+
+    def getv(self, variable):
+        self._log("getv", variable)
+        return self.variables[variable]
+
+    def save(self, file):
+        self._log("save", file)
+        self.file = file
+        with open(file, "w") as f:
+            json.dump({"properties": [[*key, value] for key, value in self.properties.items()
+                                      if not isinstance(value, np.ndarray)], "solved": self.solved}, f)
+
+    def load(self, file):
+        self._log("load", file)
+        self.file = file
+        with open(file, "r") as f:
+            state = json.load(f)
+        self.properties = {(o, p): v for o, p, v in state["properties"]}
+        self.solved = state["solved"]
+
+    def clearjobs(self):
+        self._log("clearjobs")
+        self.jobs = []
+
+    def addjob(self, file):
+        self._log("addjob", file)
+        self.jobs.append(file)
+
+    def runjobs(self):
+        self._log("runjobs")
+        for file in self.jobs:
+            if file in self.failed_jobs:
+                continue
+            with open(file, "r") as f:
+                state = json.load(f)
+            state["solved"] = True
+            with open(file, "w") as f:
+                json.dump(state, f)
+
+    def close(self):
+        self._log("close")
+        self.closed = True
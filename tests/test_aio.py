@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+import pytest
+from lumflows.aio import AsyncFDTD
+
+def test_sessions_run_concurrently(lumapi):
+    def on_run(session):
+        time.sleep(0.2)
+
+    lumapi.FDTD.on_run = on_run
+
+    async def main():
+        sessions = await asyncio.gather(*(AsyncFDTD.open(hide=True, remoteArgs={"hostname": f"host{i}", "port": 8989})
+                                          for i in range(4)))
+        await asyncio.gather(*(session.setnamed("source", "angle theta", 10.0 * i) for i, session in enumerate(sessions)))
+        await sessions[0].configure("FDTD", {"x span": 1.0, "y span": 2.0})
+
+        start = time.perf_counter()
+        await asyncio.gather(*(session.run() for session in sessions))
+        elapsed = time.perf_counter() - start
+
+        data = await sessions[1].getdata("monitor", "f")
+        polarization = await sessions[2].set_source_polarization("source", 90)
+        for session in sessions:
+            await session.close()
+        return sessions, elapsed, data, polarization
+
+    sessions, elapsed, data, polarization = asyncio.run(main())
+
+    assert elapsed < 0.6
+    assert data.shape == (11, 1)
+    assert sessions[3].fdtd.fdtd.properties[("source", "angle theta")] == 30.0
+    assert sessions[0].fdtd.fdtd.properties[("FDTD", "y span")] == 2.0
+    assert all(session.fdtd.fdtd.closed for session in sessions)
+
+def test_calls_of_a_session_run_in_its_own_thread(lumapi):
+    threads = []
+    lumapi.FDTD.on_run = lambda session: threads.append(threading.current_thread())
+
+    async def main():
+        async with await AsyncFDTD.open() as session:
+            await session.run()
+            await session.run()
+
+    asyncio.run(main())
+
+    assert threads[0] is threads[1]
+    assert threads[0] is not threading.main_thread()
+
+def test_timeout_and_close(lumapi):
+    release = threading.Event()
+    lumapi.FDTD.on_run = lambda session: release.wait(5.0)
+
+    async def main():
+        session = await AsyncFDTD.open(timeout=0.1)
+        with pytest.raises(asyncio.TimeoutError):
+            await session.run()
+
+        # The running call cannot be interrupted: later calls wait for it
+        release.set()
+        await session.close()
+        with pytest.raises(RuntimeError):
+            await session.run()
+        return session
+
+    session = asyncio.run(main())
+    assert session.fdtd.fdtd.closed
+
+def test_cancelled_calls_that_did_not_start_are_dropped(lumapi):
+    release = threading.Event()
+    lumapi.FDTD.on_run = lambda session: release.wait(5.0)
+
+    async def main():
+        session = await AsyncFDTD.open()
+        running = asyncio.ensure_future(session.run())
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(session.setnamed("source", "angle theta", 45.0))
+        await asyncio.sleep(0.05)
+        queued.cancel()
+        # Let the loop deliver the cancellation before the running call returns
+        await asyncio.sleep(0.05)
+        release.set()
+        await running
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        await session.close()
+        return session
+
+    session = asyncio.run(main())
+    assert ("source", "angle theta") not in session.fdtd.fdtd.properties
+
+def test_open_with_a_session_factory():
+    class Stub():
+        def __init__(self):
+            self.closed = False
+
+        def close(self):
+            self.closed = True
+
+    async def main():
+        session = await AsyncFDTD.open(session_factory=Stub)
+        await session.close()
+        await session.close()
+        return session
+
+    assert asyncio.run(main()).fdtd.closed
+
+def test_close_is_not_bound_by_the_default_timeout(lumapi):
+    release = threading.Event()
+    lumapi.FDTD.on_run = lambda session: release.wait(5.0)
+
+    async def main():
+        session = await AsyncFDTD.open(timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await session.run()
+
+        # The running call outlasts the default timeout, close() waits for it anyway
+        threading.Timer(0.2, release.set).start()
+        await session.close()
+        return session
+
+    assert asyncio.run(main()).fdtd.fdtd.closed
+
+def test_session_arriving_after_an_open_timeout_is_closed():
+    created = []
+
+    class SlowStub():
+        def __init__(self):
+            time.sleep(0.2)
+            self.closed = False
+            created.append(self)
+
+        def close(self):
+            self.closed = True
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await AsyncFDTD.open(timeout=0.05, session_factory=SlowStub)
+        await asyncio.sleep(0.4)
+
+    asyncio.run(main())
+    assert len(created) == 1 and created[0].closed
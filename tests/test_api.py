@@ -0,0 +1,225 @@
+import os
+import numpy as np
+import pytest
+from lumflows.api import FDTD, _to_lsf
+from lumflows.definitions import BC_X_MIN, BC_X_MAX, BC_PML, BC_PERIODIC
+
+def test_to_lsf_literals():
+    assert _to_lsf(True) == "1"
+    assert _to_lsf(3) == "3"
+    assert _to_lsf(0.5) == "0.5"
+    assert _to_lsf("FDTD") == '"FDTD"'
+    assert _to_lsf('say "hi"') == "'say \"hi\"'"
+    assert _to_lsf([1, 2]) == "[1.0;2.0]"
+    assert _to_lsf(np.eye(2)) == "[1.0,0.0;0.0,1.0]"
+
+def test_batch_sends_one_script(lumapi):
+    fdtd = FDTD()
+    session = fdtd.fdtd
+
+    with fdtd.batch():
+        fdtd.set_bc_x(BC_PERIODIC, BC_PERIODIC)
+        fdtd.set_number_of_points_globally(11)
+        assert session.properties == {}
+
+    assert len(session.evals) == 1
+    assert session.properties[("FDTD", BC_X_MIN)] == BC_PERIODIC
+    assert session.properties[("FDTD", BC_X_MAX)] == BC_PERIODIC
+    assert session.global_monitor
+    assert fdtd.roundtrips_saved == 2
+
+def test_batch_discards_changes_on_error(lumapi):
+    fdtd = FDTD()
+
+    with pytest.raises(KeyError):
+        with fdtd.batch():
+            fdtd.set_bc_x(BC_PML, BC_PML)
+            raise KeyError("abort")
+
+    assert fdtd.fdtd.evals == []
+
+def test_configure_matches_unbatched_setnamed(lumapi):
+    fdtd = FDTD()
+    saved = fdtd.configure("source", {"angle theta": 30.0, "name": "src", "polarization angle": 90})
+
+    assert saved == 2
+    assert fdtd.fdtd.properties == {("source", "angle theta"): 30.0, ("source", "name"): "src",
+                                    ("source", "polarization angle"): 90}
+
+def test_collect(lumapi):
+    fdtd = FDTD()
+    fdtd.monitor_names = ["T", "R_mon"]
+    result = fdtd.collect(quantities=("T", "power"))
+
+    assert len(fdtd.fdtd.evals) == 1
+    assert result["f"].shape == (11,)
+    assert np.allclose(result["wavelengths"], 299792458.0 / result["f"] * 1e9)
+    assert np.all(result["T/T"] == 0.5)
+    assert np.all(result["R_mon/power"] == 5.0)
+
+    records = fdtd.collect(quantities=("T",), as_records=True)
+    assert records.dtype.names == ("f", "wavelengths", "T/T", "R_mon/T")
+
+def test_collect_requires_monitors(lumapi):
+    with pytest.raises(ValueError):
+        FDTD().collect()
+
+@pytest.mark.parametrize("value", [None, ["a", "b"], 'both "double" and \'single\' quotes'])
+def test_batch_falls_back_to_setnamed_for_values_without_literal(lumapi, value):
+    fdtd = FDTD()
+    session = fdtd.fdtd
+
+    with fdtd.batch():
+        fdtd._setnamed("obj", "x", 1.0)
+        fdtd._setnamed("obj", "y", value)
+        fdtd._setnamed("obj", "x", 2.0)
+
+    assert session.properties[("obj", "y")] == value
+    assert session.properties[("obj", "x")] == 2.0
+    # The first change is sent before the direct call, the last one at the end of the block
+    assert [name for name, _ in session.calls if name in ("eval", "setnamed")] == ["eval", "setnamed", "setnamed", "eval", "setnamed"]
+
+def test_run_queued_reports_failed_jobs(lumapi, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    fdtd = FDTD()
+    files = [fdtd.queue_variant(f"variant_{angle}", {"source": {"angle theta": angle}}) for angle in (0.0, 30.0, 60.0)]
+    fdtd.fdtd.failed_jobs.add(files[1])
+
+    reported = []
+    records = fdtd.run_queued(max_concurrent=2, extract=lambda fdtd, name: fdtd.fdtd.properties[("source", "angle theta")],
+                              progress=lambda done, total, record: reported.append((done, total)))
+
+    assert reported == [(1, 3), (2, 3), (3, 3)]
+    assert records["variant_0.0"]["error"] is None and records["variant_0.0"]["result"] == 0.0
+    assert records["variant_60.0"]["error"] is None and records["variant_60.0"]["result"] == 60.0
+    assert isinstance(records["variant_30.0"]["error"], RuntimeError)
+    assert records["variant_30.0"]["result"] is None and records["variant_30.0"]["elapsed"] is None
+    assert ("load", (files[1],)) not in fdtd.fdtd.calls
+
+def test_run_cached_after_run_queued_uses_the_loaded_variant(lumapi, tmp_path, monkeypatch):
+    from lumflows.cache import ResultCache
+
+    monkeypatch.chdir(tmp_path)
+    cache = ResultCache(str(tmp_path / "cache"))
+    extract = lambda fdtd: {"theta": np.array(fdtd.fdtd.properties[("source", "angle theta")])}
+
+    fdtd = FDTD()
+    fdtd.setnamed("source", "angle theta", 0.0)
+    assert fdtd.run_cached(cache, extract=extract)["theta"] == 0.0
+
+    fdtd.queue_variant("variant", {"source": {"angle theta": 45.0}})
+    fdtd.run_queued(extract=lambda fdtd, name: None)
+
+    assert fdtd.run_cached(cache, extract=extract)["theta"] == 45.0
+
+def test_failed_batch_is_not_recorded(lumapi):
+    fdtd = FDTD()
+    key = fdtd.config_hash()
+
+    with pytest.raises(RuntimeError):
+        with fdtd.batch():
+            fdtd._setnamed("obj", "x", 1.0)
+            raise RuntimeError("abort")
+    assert fdtd.config_hash() == key
+
+    def failing_eval(script):
+        raise RuntimeError("solver rejected the script")
+
+    fdtd.fdtd.eval = failing_eval
+    with pytest.raises(RuntimeError):
+        fdtd.configure("obj", {"x": 1.0, "y": 2.0})
+    assert fdtd.config_hash() == key
+
+def test_delegated_setters_are_recorded(lumapi):
+    fdtd = FDTD()
+    key = fdtd.config_hash()
+
+    fdtd.setnamed("source", "angle theta", 30.0)
+    assert fdtd.fdtd.properties[("source", "angle theta")] == 30.0
+    assert fdtd.config_hash() != key
+
+    # A delegated setnamed and the helper produce the same key
+    other = FDTD()
+    other._setnamed("source", "angle theta", 30.0)
+    assert other.config_hash() == fdtd.config_hash()
+
+    # Queries are not recorded
+    key = fdtd.config_hash()
+    fdtd.getnamed("source", "angle theta")
+    assert fdtd.config_hash() == key
+
+def test_sessions_with_different_histories_share_the_hash(lumapi):
+    fdtd = FDTD()
+    fdtd._setnamed("source", "angle theta", 10.0)
+    fdtd.set_number_of_points_globally(101)
+    fdtd._setnamed("source", "angle theta", 30.0)
+
+    other = FDTD()
+    other.set_number_of_points_globally(101)
+    other.setnamed("source", "angle theta", 30.0)
+
+    assert fdtd.config_hash() == other.config_hash()
+
+def test_loading_a_project_starts_a_new_record(lumapi, tmp_path):
+    lumapi.FDTD().save(str(tmp_path / "model.fsp"))
+
+    fdtd = FDTD()
+    fdtd._setnamed("source", "angle theta", 30.0)
+    fdtd.load_project(str(tmp_path / "model"))
+
+    other = FDTD()
+    other.load(str(tmp_path / "model.fsp"))
+
+    assert fdtd.config_hash() == other.config_hash() != FDTD().config_hash()
+
+def test_projects_are_hashed_on_first_use(lumapi, tmp_path, monkeypatch):
+    from lumflows import api
+
+    lumapi.FDTD().save(str(tmp_path / "model.fsp"))
+    hashed = []
+    file_digest = api._file_digest
+    monkeypatch.setattr(api, "_file_digest", lambda file: hashed.append(file) or file_digest(file))
+    api.PROJECT_DIGEST_CACHE.clear()
+
+    fdtd = FDTD()
+    fdtd.load_project(str(tmp_path / "model"))
+    assert hashed == []
+
+    fdtd.config_hash()
+    fdtd.config_hash()
+    assert len(hashed) == 1
+
+def test_run_cached_hits_after_the_project_was_run(lumapi, tmp_path, monkeypatch):
+    from lumflows import api
+    from lumflows.cache import ResultCache
+
+    monkeypatch.chdir(tmp_path)
+    lumapi.FDTD().save(str(tmp_path / "model.fsp"))
+
+    hashed = []
+    file_digest = api._file_digest
+    monkeypatch.setattr(api, "_file_digest", lambda file: hashed.append(file) or file_digest(file))
+
+    cache = ResultCache(str(tmp_path / "cache"))
+    extract = lambda fdtd: {"theta": np.array(fdtd.fdtd.properties[("source", "angle theta")])}
+
+    def run_point(theta):
+        fdtd = FDTD()
+        fdtd.load_project("model")
+        fdtd.setnamed("source", "angle theta", theta)
+        result = fdtd.run_cached(cache, extract=extract)
+        return fdtd, result
+
+    fdtd, result = run_point(30.0)
+    assert result["theta"] == 30.0 and fdtd.fdtd.calls.count(("run", ())) == 1
+
+    # The run did not touch the loaded project, so the same point is served from the cache
+    fdtd, result = run_point(30.0)
+    assert result["theta"] == 30.0 and ("run", ()) not in fdtd.fdtd.calls
+
+    # A different point run through a delegated setnamed gets its own entry
+    fdtd, result = run_point(60.0)
+    assert result["theta"] == 60.0 and fdtd.fdtd.calls.count(("run", ())) == 1
+
+    assert len(hashed) == 1
+    assert not [name for name in os.listdir(cache.directory) if name.endswith(".fsp")]
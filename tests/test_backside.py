@@ -0,0 +1,109 @@
+import numpy as np
+from lumflows.definitions import S_POLARIZED, P_POLARIZED, UNPOLARIZED
+from lumflows.spectral_tools import (compute_with_backside, compute_with_backside_batch,
+                                     compute_angle_resolved_with_backside)
+from lumflows.utils import compute_backside_fresnel, compute_absoprtion_term, compute_refracted_absorption_term
+from lumflows.multilayer import layer_attenuation
+
+WVLS = np.linspace(400.0, 800.0, 41)
+
+def _substrate(k = 0.0):
+    return np.full(WVLS.shape, 1.52 - 1j * k)
+
+def _bare_front(shape = WVLS.shape):
+    # A non-reflecting front side isolates the backside terms
+    return np.zeros(shape), np.ones(shape), np.zeros(shape), np.ones(shape)
+
+def test_batch_matches_single_spectrum_at_normal_incidence():
+    rng = np.random.default_rng(0)
+    R_f, T_f, R_r, T_r = rng.uniform(0.0, 0.5, (4, 3, len(WVLS)))
+    N = _substrate(1e-6)
+
+    R, T = compute_with_backside_batch(WVLS, R_f, T_f, R_r, T_r, N_substrate=N)
+    for i in range(3):
+        R_i, T_i = compute_with_backside(WVLS, R_f[i], T_f[i], R_r[i], T_r[i], N_substrate=N)
+        assert np.allclose(R[i], R_i, rtol=0.0, atol=1e-15)
+        assert np.allclose(T[i], T_i, rtol=0.0, atol=1e-15)
+
+def test_batch_backside_reflectance_is_resolved_per_angle():
+    theta = np.array([0.0, 30.0, 60.0, 80.0])
+    N = _substrate()
+
+    R, T = compute_with_backside_batch(WVLS, *_bare_front((len(theta), len(WVLS))), N_substrate=N,
+                                       theta=theta, polarization=S_POLARIZED)
+
+    assert np.allclose(R, compute_backside_fresnel(N, theta[:, np.newaxis], S_POLARIZED))
+    assert np.allclose(R + T, 1.0)
+    assert np.all(np.diff(R[:, 0]) > 0.0)
+
+def test_batch_absorption_grows_with_angle():
+    theta = np.array([0.0, 30.0, 60.0])
+    R, T = compute_with_backside_batch(WVLS, *_bare_front((len(theta), len(WVLS))), N_substrate=_substrate(1e-5),
+                                       theta=theta)
+
+    # Longer refracted path, more absorption: T drops faster than the Fresnel losses alone
+    T_lossless = compute_with_backside_batch(WVLS, *_bare_front((len(theta), len(WVLS))), N_substrate=_substrate(),
+                                             theta=theta)[1]
+    attenuation = T / T_lossless
+    assert np.all(np.diff(attenuation, axis=0) < 0.0)
+
+def test_angle_resolved_unpolarized_is_mean_of_s_and_p():
+    theta = np.array([10.0, 50.0])
+    front = _bare_front((len(theta), len(WVLS)))
+    N = _substrate(1e-6)
+
+    R_s, T_s = compute_angle_resolved_with_backside(WVLS, *front, theta, polarization=S_POLARIZED, N_substrate=N)
+    R_p, T_p = compute_angle_resolved_with_backside(WVLS, *front, theta, polarization=P_POLARIZED, N_substrate=N)
+    R, T = compute_angle_resolved_with_backside(WVLS, *front, theta, polarization=UNPOLARIZED, N_substrate=N)
+
+    assert np.allclose(R, 0.5 * (R_s + R_p))
+    assert np.allclose(T, 0.5 * (T_s + T_p))
+
+def test_absorption_term_follows_the_refracted_path():
+    N = _substrate(1e-5)
+    theta = np.array([0.0, 30.0, 60.0])[:, np.newaxis]
+    beta = compute_absoprtion_term(WVLS, N, theta=theta, thickness=1e6)
+
+    # Weak absorption: beta = -2 pi k d / (lambda cos(theta_r))
+    cos_refracted = np.sqrt(1.0 - (1.0003 * np.sin(np.radians(theta)) / 1.52) ** 2)
+    assert np.allclose(beta, -2 * np.pi * 1e-5 * 1e6 / (WVLS * cos_refracted), rtol=1e-6)
+    assert np.array_equal(beta, compute_refracted_absorption_term(WVLS, N, theta=theta, thickness=1e6))
+
+def test_every_angle_path_uses_the_refracted_absorption():
+    N = _substrate(1e-5)
+    front = _bare_front()
+
+    R, T = compute_with_backside(WVLS, *front, N_substrate=N, theta=60.0)
+    R_ref, T_ref = compute_angle_resolved_with_backside(WVLS, *front, np.array(60.0), N_substrate=N)
+    assert np.allclose(R, R_ref) and np.allclose(T, T_ref)
+
+    attenuation = layer_attenuation(WVLS, N, 1e6, theta=np.array([0.0, 60.0])[:, np.newaxis])
+    assert np.all(attenuation[1] < attenuation[0])
+
+def test_separate_s_and_p_front_spectra():
+    theta = np.array([70.0])
+    shape = (len(theta), len(WVLS))
+    N = _substrate(1e-6)
+    front_s = (np.full(shape, 0.3), np.full(shape, 0.7), np.full(shape, 0.3), np.full(shape, 0.7))
+    front_p = (np.full(shape, 0.05), np.full(shape, 0.95), np.full(shape, 0.05), np.full(shape, 0.95))
+
+    R, T = compute_angle_resolved_with_backside(WVLS, *front_s, theta, N_substrate=N, front_p=front_p)
+    R_s, T_s = compute_angle_resolved_with_backside(WVLS, *front_s, theta, polarization=S_POLARIZED, N_substrate=N)
+    R_p, T_p = compute_angle_resolved_with_backside(WVLS, *front_p, theta, polarization=P_POLARIZED, N_substrate=N)
+    assert np.allclose(R, 0.5 * (R_s + R_p)) and np.allclose(T, 0.5 * (T_s + T_p))
+
+    # Identical s and p front spectra reduce to the single-spectrum form
+    R_same, T_same = compute_angle_resolved_with_backside(WVLS, *front_s, theta, N_substrate=N, front_p=front_s)
+    R_single, T_single = compute_angle_resolved_with_backside(WVLS, *front_s, theta, N_substrate=N)
+    assert np.array_equal(R_same, R_single) and np.array_equal(T_same, T_single)
+
+def test_normal_incidence_is_the_limit_of_oblique_incidence():
+    # A strongly absorbing substrate, where the real-index approximation of the backside would differ
+    N = np.full(WVLS.shape, 2.0 - 0.8j)
+    rng = np.random.default_rng(2)
+    front = rng.uniform(0.0, 0.5, (4, len(WVLS)))
+
+    for polarization in (S_POLARIZED, P_POLARIZED, UNPOLARIZED):
+        R_0, T_0 = compute_with_backside(WVLS, *front, N_substrate=N, thickness=10.0, polarization=polarization, n_medium=1.33)
+        R_1, T_1 = compute_with_backside(WVLS, *front, N_substrate=N, thickness=10.0, theta=1e-6, polarization=polarization, n_medium=1.33)
+        assert np.allclose(R_0, R_1, rtol=1e-9, atol=0.0) and np.allclose(T_0, T_1, rtol=1e-9, atol=0.0)
@@ -0,0 +1,64 @@
+import threading
+import numpy as np
+import pytest
+
+pytest.importorskip("h5py")
+
+from lumflows.dataset import SweepDataset, CHANNELS
+from lumflows.sweep import parameter_grid
+
+WVLS = np.linspace(400.0, 800.0, 201)
+
+def _spectra(point):
+    return [np.full(WVLS.shape, point["theta"] + 1000.0 * point["d"] + i) for i in range(4)]
+
+def test_append_find_and_slice(tmp_path):
+    path = str(tmp_path / "sweep.h5")
+    points = parameter_grid(theta=[0.0, 30.0, 60.0], d=[1.0, 2.0])
+
+    with SweepDataset(path, wvls=WVLS, parameters=["theta", "d"]) as dataset:
+        for point in points:
+            dataset.append(point, *_spectra(point))
+
+    with SweepDataset(path, "r") as dataset:
+        assert len(dataset) == len(points)
+        run = dataset.get(theta=30.0, d=2.0)
+        assert set(run) == set(CHANNELS)
+        assert np.all(run["T_f"] == 2031.0)
+        assert np.all(np.isnan(run["R"]))
+
+        wvls, data = dataset.wavelength_slice(500.0, 510.0, "R_f")
+        assert np.all((wvls >= 500.0) & (wvls <= 510.0))
+        assert data.shape == (len(points), len(wvls))
+
+        with pytest.raises(KeyError):
+            dataset.find(theta=45.0, d=1.0)
+
+def test_concurrent_appends_do_not_overwrite_each_other(tmp_path):
+    points = parameter_grid(theta=np.arange(25.0), d=np.arange(8.0))
+
+    with SweepDataset(str(tmp_path / "sweep.h5"), wvls=WVLS, parameters=["theta", "d"]) as dataset:
+        def worker(chunk):
+            for point in chunk:
+                dataset.append(point, *_spectra(point))
+
+        threads = [threading.Thread(target=worker, args=(points[i::8],)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(dataset) == len(points)
+        for point in points:
+            assert np.all(dataset.get(**point)["R_f"] == _spectra(point)[0])
+
+def test_reopen_validates_grid_and_parameters(tmp_path):
+    path = str(tmp_path / "sweep.h5")
+    SweepDataset(path, wvls=WVLS, parameters=["theta", "d"]).close()
+
+    with pytest.raises(ValueError):
+        SweepDataset(path, wvls=WVLS + 1.0, parameters=["theta", "d"])
+    with pytest.raises(ValueError):
+        SweepDataset(path, wvls=WVLS, parameters=["d", "theta"])
+
+    SweepDataset(path, wvls=WVLS, parameters=["theta", "d"]).close()
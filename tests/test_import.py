@@ -0,0 +1,23 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+# Plotting, HDF5 and the Lumerical API must stay out of the light-weight entry points
+HEAVY_MODULES = ("matplotlib", "h5py", "lumapi")
+
+PROBE = """
+import json, sys
+import {module}
+print(json.dumps([name for name in {heavy!r} if name in sys.modules]))
+"""
+
+@pytest.mark.parametrize("module", ["lumflows.spectral_tools", "lumflows.io", "lumflows.parsers"])
+def test_module_does_not_import_heavy_dependencies(module):
+    # A fresh interpreter, as the test session itself may have imported them already
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                            check=True, capture_output=True, text=True, cwd=root).stdout
+
+    assert json.loads(output.strip().splitlines()[-1]) == []
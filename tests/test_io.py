@@ -0,0 +1,16 @@
+import os
+import numpy as np
+from lumflows.io import csv2db
+
+def test_csv2db_accepts_any_extension_case(tmp_path):
+    source = tmp_path / "csv"
+    source.mkdir()
+    for file, n in (("SiO2.CSV", 1.45), ("TiO2.csv", 2.4)):
+        with open(source / file, "w") as f:
+            f.write("Wavelength,n,k\nnm,,\n200,%s,0.0\n1100,%s,0.001\n" % (n, n))
+
+    x, results = csv2db(str(source), start_x=300.0, stop_x=900.0, step=100, db_dir=str(tmp_path / "db"))
+
+    assert sorted(results) == ["SiO2", "TiO2"]
+    assert np.allclose(results["SiO2"][0], 1.45) and np.allclose(results["TiO2"][0], 2.4)
+    assert len(os.listdir(tmp_path / "db")) == 2
@@ -0,0 +1,51 @@
+import os
+import shutil
+import numpy as np
+import pytest
+from lumflows import utils
+from lumflows.matdb import build_material_db
+
+def _write_material(db_dir, name, n):
+    wvls = np.linspace(300.0, 900.0, 7)
+    data = np.column_stack([wvls, np.full(wvls.shape, n), np.full(wvls.shape, 1e-6)])
+    np.savetxt(os.path.join(db_dir, name + "_nk.txt"), data, delimiter="\t", header="wvl\tn\tk", comments="")
+
+@pytest.fixture
+def db_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "_get_db_dir", lambda: str(tmp_path))
+    utils.clear_material_cache()
+    yield str(tmp_path)
+    utils.clear_material_cache()
+
+def test_compiled_database_returns_the_text_data(db_dir):
+    _write_material(db_dir, "B270", 1.52)
+    _write_material(db_dir, "SiO2", 1.46)
+    index = build_material_db(db_dir)
+
+    assert sorted(index["materials"]) == ["B270", "SiO2"]
+    assert isinstance(utils.read_mat_file("SiO2"), np.memmap)
+    assert np.all(utils.read_mat_file("SiO2")[1] == 1.46)
+    assert np.all(utils.read_mat_file("B270")[1] == 1.52)
+
+def test_rebuild_removes_the_previous_data(db_dir):
+    _write_material(db_dir, "B270", 1.52)
+    first = build_material_db(db_dir)
+    second = build_material_db(db_dir)
+
+    assert first["data"] != second["data"]
+    assert sorted(name for name in os.listdir(db_dir) if name.endswith(".npy")) == [second["data"]]
+
+def test_stale_index_is_never_paired_with_new_data(db_dir):
+    _write_material(db_dir, "SiO2", 1.46)
+    build_material_db(db_dir)
+    stale_index = os.path.join(db_dir, "stale.json")
+    shutil.copy(os.path.join(db_dir, utils.COMPILED_INDEX), stale_index)
+
+    # A material sorted before SiO2 shifts its offset in the new bundle
+    _write_material(db_dir, "B270", 1.52)
+    build_material_db(db_dir)
+
+    # A reader that still holds the previous index must not read the new data with old offsets
+    os.replace(stale_index, os.path.join(db_dir, utils.COMPILED_INDEX))
+    utils.clear_material_cache()
+    assert np.all(utils.read_mat_file("SiO2")[1] == 1.46)
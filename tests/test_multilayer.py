@@ -0,0 +1,27 @@
+import numpy as np
+from lumflows.multilayer import fresnel_interface, incoherent_stack, layer_attenuation
+
+WVLS = np.linspace(400.0, 800.0, 81)
+
+def test_incoherent_stack_matches_the_explicit_series():
+    N = np.full(WVLS.shape, 1.52 - 1e-6j)
+    front = fresnel_interface(1.0, N)
+    back = fresnel_interface(N, 1.0)
+    R, T, R_reverse, T_reverse = incoherent_stack(WVLS, [front, back], [(N, 1e6)])
+
+    a = layer_attenuation(WVLS, N, 1e6)
+    R_1 = front[0]
+    R_2 = back[0]
+    loss = 1.0 - R_1 * R_2 * a * a
+    assert np.allclose(R, R_1 + (1.0 - R_1) ** 2 * R_2 * a * a / loss)
+    assert np.allclose(T, (1.0 - R_1) * (1.0 - R_2) * a / loss)
+    # A symmetric sample looks the same from both sides
+    assert np.allclose(R, R_reverse) and np.allclose(T, T_reverse)
+
+def test_opaque_layer_stays_finite():
+    N = np.full(WVLS.shape, 1.5 - 1.0j)
+    interface = fresnel_interface(1.0, N)
+    R, T, _, _ = incoherent_stack(WVLS, [interface, fresnel_interface(N, 1.0)], [(N, 1e7)])
+
+    assert np.all(np.isfinite(R)) and np.allclose(T, 0.0)
+    assert np.allclose(R, interface[0])
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import numpy as np
+from lumflows.store import SpectraStore, correct_with_backside_inplace
+from lumflows.spectral_tools import compute_with_backside_batch
+
+WVLS = np.linspace(400.0, 800.0, 51)
+
+def test_views_outlive_close():
+    # Run in a separate interpreter: reading an unmapped segment would crash pytest itself
+    script = textwrap.dedent("""
+        import gc
+        import numpy as np
+        from lumflows.store import SpectraStore
+
+        with SpectraStore.create(4, np.linspace(400.0, 800.0, 51)) as store:
+            R = store["R"]
+            R[:] = 1.0
+        gc.collect()
+        assert R.sum() == 4 * 51
+        R[0, 0] = 2.0
+        del R
+        gc.collect()
+    """)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    assert result.returncode == 0, result.stderr
+
+def test_workers_correct_the_shared_spectra():
+    N = np.full(WVLS.shape, 1.52 - 1e-6j)
+    rng = np.random.default_rng(1)
+
+    with SpectraStore.create(8, WVLS) as store:
+        for channel in ("R_f", "T_f", "R_r", "T_r"):
+            store[channel][:] = rng.uniform(0.0, 0.5, store[channel].shape)
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            list(pool.map(partial(correct_with_backside_inplace, store.handle, N_substrate=N), [slice(0, 4), slice(4, 8)]))
+
+        R, T = compute_with_backside_batch(WVLS, store["R_f"], store["T_f"], store["R_r"], store["T_r"], N_substrate=N)
+        assert np.allclose(store["R"], R) and np.allclose(store["T"], T)
+
+def test_memory_mapped_store(tmp_path):
+    path = str(tmp_path / "spectra.bin")
+    with SpectraStore.create(3, WVLS, path=path) as store:
+        store["T"][:] = 0.25
+        handle = store.handle
+
+    with SpectraStore.attach(handle) as store:
+        assert np.array_equal(store.wvls, WVLS)
+        assert np.all(store["T"] == 0.25)
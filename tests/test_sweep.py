@@ -0,0 +1,136 @@
+import pytest
+from lumflows.sweep import SweepRunner, parameter_grid
+
+def _setup(fdtd, point):
+    fdtd.configure("source", {"angle theta": point["theta"]})
+
+def _extract(fdtd, point):
+    return fdtd.fdtd.properties[("source", "angle theta")]
+
+def test_parameter_grid():
+    grid = parameter_grid(theta=[0, 30], polarization=[0, 90, 45])
+
+    assert len(grid) == 6
+    assert grid[0] == {"theta": 0, "polarization": 0}
+    assert grid[-1] == {"theta": 30, "polarization": 45}
+
+def test_run_returns_records_in_order(lumapi):
+    points = parameter_grid(theta=range(10))
+    records = SweepRunner(_setup, extract=_extract, sessions=3).run(points)
+
+    assert [record["result"] for record in records] == list(range(10))
+    assert all(record["error"] is None and record["attempts"] == 1 for record in records)
+    assert 1 <= len(lumapi.FDTD.instances) <= 3
+    assert all(session.closed for session in lumapi.FDTD.instances)
+
+def test_failed_point_is_retried_in_a_fresh_session(lumapi):
+    failures = []
+
+    def on_run(session):
+        if session.properties[("source", "angle theta")] == 2 and not failures:
+            failures.append(session)
+            raise RuntimeError("solver crashed")
+
+    lumapi.FDTD.on_run = on_run
+    records = SweepRunner(_setup, extract=_extract, sessions=1, retries=1).run(parameter_grid(theta=range(4)))
+
+    assert [record["result"] for record in records] == [0, 1, 2, 3]
+    assert records[2]["attempts"] == 2
+    assert failures[0].closed
+    assert len(lumapi.FDTD.instances) == 2
+
+def test_error_is_reported_after_the_last_retry(lumapi):
+    def on_run(session):
+        raise RuntimeError("solver crashed")
+
+    lumapi.FDTD.on_run = on_run
+    results = []
+    records = SweepRunner(_setup, extract=_extract, sessions=2, retries=2).run(
+        parameter_grid(theta=range(3)), on_result=lambda index, record: results.append(index))
+
+    assert sorted(results) == [0, 1, 2]
+    assert all(isinstance(record["error"], RuntimeError) and record["attempts"] == 3 for record in records)
+    assert all(session.closed for session in lumapi.FDTD.instances)
+
+def test_sessions_must_be_positive():
+    with pytest.raises(ValueError):
+        SweepRunner(_setup, sessions=0)
+
+def test_journal_locations_point_at_their_own_results(lumapi, tmp_path):
+    import time
+    from lumflows.journal import SweepJournal
+
+    stored = []
+
+    def locate(point, result):
+        # Not thread-safe on purpose: the runner must serialize it with the journal
+        index = len(stored)
+        time.sleep(0.0005)
+        stored.append(result)
+        return index
+
+    points = parameter_grid(theta=range(200))
+    runner = SweepRunner(_setup, extract=_extract, sessions=8)
+    with SweepJournal(str(tmp_path / "journal.jsonl")) as journal:
+        runner.run(points, journal=journal, locate=locate)
+
+    assert len(stored) == len(points)
+    with SweepJournal(str(tmp_path / "journal.jsonl")) as journal:
+        assert len(journal) == len(points)
+        for point in points:
+            assert stored[journal.get(point)["location"]] == point["theta"]
+
+def test_journal_resumes_an_interrupted_sweep(lumapi, tmp_path):
+    from lumflows.journal import SweepJournal
+
+    path = str(tmp_path / "journal.jsonl")
+    points = parameter_grid(theta=range(10))
+
+    def on_run(session):
+        if session.properties[("source", "angle theta")] >= 5:
+            raise RuntimeError("solver crashed")
+
+    lumapi.FDTD.on_run = on_run
+    with SweepJournal(path) as journal:
+        records = SweepRunner(_setup, extract=_extract, sessions=2, retries=0).run(points, journal=journal, locate=lambda point, result: result)
+    assert sum(record["error"] is None for record in records) == 5
+
+    # A crash during a write leaves a partial last line
+    with open(path, "a") as f:
+        f.write('{"key": "tor')
+
+    lumapi.FDTD.on_run = None
+    lumapi.FDTD.instances.clear()
+    with SweepJournal(path) as journal:
+        assert len(journal.remaining(points)) == 5
+        records = SweepRunner(_setup, extract=_extract, sessions=2).run(points, journal=journal, locate=lambda point, result: result)
+
+    assert [record["result"] for record in records] == list(range(10))
+    assert [record["attempts"] for record in records] == [0] * 5 + [1] * 5
+    runs = sum(session.calls.count(("run", ())) for session in lumapi.FDTD.instances)
+    assert runs == 5
+
+    with SweepJournal(path) as journal:
+        assert len(journal) == 10
+
+def test_failing_locate_and_on_result_do_not_stop_the_sweep(lumapi, tmp_path):
+    from lumflows.journal import SweepJournal
+
+    def locate(point, result):
+        if result == 3:
+            raise OSError("disk full")
+        return result
+
+    def on_result(index, record):
+        if index == 5:
+            raise ValueError("callback failed")
+
+    points = parameter_grid(theta=range(8))
+    with SweepJournal(str(tmp_path / "journal.jsonl")) as journal:
+        records = SweepRunner(_setup, extract=_extract, sessions=1).run(points, on_result=on_result, journal=journal, locate=locate)
+
+        assert all(record is not None for record in records)
+        assert isinstance(records[3]["error"], OSError) and points[3] not in journal
+        assert isinstance(records[5]["error"], ValueError)
+        assert [record["error"] is None for record in records] == [True] * 3 + [False, True, False, True, True]
+        assert len(journal) == 7
@@ -0,0 +1,49 @@
+import numpy as np
+from lumflows.definitions import S_POLARIZED, P_POLARIZED, UNPOLARIZED
+from lumflows.tmm import tmm, rta
+from lumflows.utils import compute_backside_fresnel
+
+WVLS = np.linspace(400.0, 800.0, 81)
+
+def test_bare_interface_matches_fresnel():
+    theta = np.array([0.0, 30.0, 60.0])[:, np.newaxis]
+    N = np.full(WVLS.shape, 1.52 + 0j)
+
+    for polarization in (S_POLARIZED, P_POLARIZED, UNPOLARIZED):
+        R, T, A = tmm(WVLS, [], [], theta=theta, polarization=polarization, n_incident=1.0, exit_medium=N)
+        # Reflectance is symmetric for a lossless interface, so the backside formula applies from the front
+        assert np.allclose(R, compute_backside_fresnel(N, theta, polarization, n_medium=1.0))
+        assert np.allclose(A, 0.0)
+
+def test_quarter_wave_coating_on_glass():
+    n_glass, center = 1.52, 600.0
+    n_coating = np.sqrt(n_glass)
+    R, T, A = tmm(WVLS, [n_coating], [center / (4 * n_coating)], n_incident=1.0, exit_medium=n_glass)
+
+    assert R[np.argmin(np.abs(WVLS - center))] < 1e-12
+    assert np.allclose(R + T, 1.0)
+
+def test_brewster_angle():
+    n_glass = 1.52
+    brewster = np.degrees(np.arctan(n_glass))
+    R, _, _ = tmm(WVLS, [], [], theta=brewster, polarization=P_POLARIZED, n_incident=1.0, exit_medium=n_glass)
+
+    assert np.all(R < 1e-20)
+
+def test_energy_is_conserved_and_absorption_is_positive():
+    layers = [1.46, 2.3 - 0.05j, 1.46]
+    thicknesses = [100.0, 50.0, 120.0]
+    theta = np.linspace(0.0, 80.0, 9)[:, np.newaxis]
+    R, T, A = tmm(WVLS, layers, thicknesses, theta=theta, n_incident=1.0, exit_medium=1.52)
+
+    assert np.all((R >= 0.0) & (T >= 0.0) & (A > 0.0))
+    assert np.allclose(R + T + A, 1.0)
+
+    R_l, T_l, A_l = tmm(WVLS, [1.46, 2.3, 1.46], thicknesses, theta=theta, n_incident=1.0, exit_medium=1.52)
+    assert np.allclose(A_l, 0.0, atol=1e-12)
+
+def test_rta_format():
+    R, T, A = rta(WVLS, [1.38], [100.0], exit_medium=1.52)
+
+    assert R.shape == (2, len(WVLS))
+    assert np.array_equal(R[0], WVLS)